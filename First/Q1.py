@@ -1,26 +1,161 @@
 """
 使用后悔值准则，进行决策
 """
+import time
 import numpy as np
 
 # 计算后悔值
-def calculate_regrets(matrix):
+# 支持单个收益矩阵 (m, n) 和批量收益矩阵 (k, m, n)，沿"方案"轴取每列最大值
+def calculate_regrets(matrix, col_max=None):
+    matrix = np.asarray(matrix)
+    # 找到每一列的最大值 (对批量输入即每个矩阵各自的列最大值)，可传入已算好的列最大值
+    if col_max is None:
+        col_max = np.max(matrix, axis=-2, keepdims=True)
+    # 计算后悔值
+    return col_max - matrix
+
+# 使用后悔值准则决策
+def regret_criterion(regrets):
+    # 计算每个方案的最大后悔值
+    max_regrets = np.max(regrets, axis=-1)
+    # 选择最大后悔值最小的方案
+    best_choice = np.argmin(max_regrets, axis=-1)
+    return best_choice, max_regrets
+
+# 批量使用后悔值准则
+def batch_regret_criterion(payoffs):
+    """
+    对一组收益矩阵一次性完成后悔值准则决策
+    参数:
+        payoffs: (k, m, n) 数组，或逐个产生 (m, n) 收益矩阵的可迭代对象/生成器
+    返回:
+        regrets: (k, m, n) 后悔值张量
+        max_regrets: (k, m) 各方案的最大后悔值
+        best_choices: (k,) 各收益矩阵下的最优方案下标
+    """
+    if not isinstance(payoffs, np.ndarray):
+        payoffs = np.stack(list(payoffs))
+    if payoffs.ndim != 3:
+        raise ValueError(f"收益矩阵组应为 (k, m, n) 数组，实际维度为 {payoffs.shape}")
+    regrets = calculate_regrets(payoffs)
+    best_choices, max_regrets = regret_criterion(regrets)
+    return regrets, max_regrets, best_choices
+
+# 不确定型决策的多准则评价
+def evaluate_criteria(matrix, alpha=0.5):
+    """
+    一次扫描收益矩阵得到列最大值、行最小值、行最大值、行均值，
+    再由这些统计量给出各决策准则的结果
+    参数:
+        matrix: (m, n) 收益矩阵或 (k, m, n) 收益矩阵组
+        alpha: 折衷准则(Hurwicz)的乐观系数
+    返回:
+        dict: 准则名 -> (最优方案下标, 各方案的评价值)
+              评价值中后悔值准则为最大后悔值(越小越好)，其余越大越好
+    """
+    matrix = np.asarray(matrix, dtype=float)
+    if not 0 <= alpha <= 1:
+        raise ValueError(f"乐观系数 alpha 应在 [0, 1] 内，实际为 {alpha}")
+
+    # 共享的统计量，每个只计算一次
+    col_max = np.max(matrix, axis=-2, keepdims=True)
+    row_min = np.min(matrix, axis=-1)
+    row_max = np.max(matrix, axis=-1)
+    row_mean = np.mean(matrix, axis=-1)
+
+    # 后悔值准则
+    best_regret, max_regrets = regret_criterion(calculate_regrets(matrix, col_max))
+    # 折衷准则
+    hurwicz = alpha * row_max + (1 - alpha) * row_min
+
+    return {
+        'maximin': (np.argmax(row_min, axis=-1), row_min),    # 悲观准则
+        'maximax': (np.argmax(row_max, axis=-1), row_max),    # 乐观准则
+        'hurwicz': (np.argmax(hurwicz, axis=-1), hurwicz),    # 折衷准则
+        'laplace': (np.argmax(row_mean, axis=-1), row_mean),  # 等可能准则
+        'regret': (best_regret, max_regrets),                 # 后悔值准则
+    }
+
+# 折衷准则乐观系数的临界点求解
+def hurwicz_breakpoints(matrix):
+    """
+    求乐观系数 alpha 在 [0, 1] 上变化时各方案成为最优的精确区间
+    每个方案的折衷值是关于 alpha 的直线 min_i + alpha * (max_i - min_i)，
+    最优方案即这些直线的上包络，排序后用凸包扫描求出，复杂度 O(m log m)
+    参数:
+        matrix: (m, n) 收益矩阵
+    返回:
+        list of (方案下标, alpha下界, alpha上界)，按 alpha 从小到大排列
+    """
+    matrix = np.asarray(matrix, dtype=float)
+    row_min = np.min(matrix, axis=1)
+    row_max = np.max(matrix, axis=1)
+
+    # 先剔除被支配的方案: 存在另一方案的行最小值和行最大值都不差时，它在 [0, 1] 上不可能更优
+    # 按行最小值降序、行最大值降序、下标升序排序，保留行最大值严格超过之前所有方案的那些
+    order = np.lexsort((np.arange(len(row_min)), -row_max, -row_min))
+    hi_sorted = row_max[order]
+    prev_max = np.concatenate(([-np.inf], np.maximum.accumulate(hi_sorted)[:-1]))
+    front = order[hi_sorted > prev_max]
+
+    # 剩余方案的截距(行最小值)严格递减、斜率严格递增，扫描求上包络
+    # 转成 Python 列表，逐个扫描时比 NumPy 标量索引快得多
+    lo = row_min[front].tolist()
+    slope = (row_max[front] - row_min[front]).tolist()
+    hull = []
+    for idx in range(len(front)):
+        while len(hull) >= 2:
+            a, b = hull[-2], hull[-1]
+            # 若 a 与新直线的交点不晚于 a 与 b 的交点，则 b 不在包络上
+            if (lo[a] - lo[idx]) * (slope[b] - slope[a]) <= (lo[a] - lo[b]) * (slope[idx] - slope[a]):
+                hull.pop()
+            else:
+                break
+        hull.append(idx)
+
+    intervals = []
+    start = 0.0
+    for pos, idx in enumerate(hull):
+        if pos + 1 < len(hull):
+            nxt = hull[pos + 1]
+            end = min((lo[idx] - lo[nxt]) / (slope[nxt] - slope[idx]), 1.0)
+        else:
+            end = 1.0
+        if end > start:
+            intervals.append((int(front[idx]), start, end))
+            start = end
+        if start >= 1.0:
+            break
+    return intervals
+
+# 原始的逐元素循环实现，仅作为性能测试的对照
+def _calculate_regrets_loop(matrix):
     regrets = np.zeros_like(matrix)
     for j in range(len(matrix[0])):
-        # 找到每一列的最大值
         max_val = np.max(matrix[:, j])
         for i in range(len(matrix)):
-            # 计算后悔值
             regrets[i][j] = max_val - matrix[i][j]
     return regrets
 
-# 使用后悔值准则决策
-def regret_criterion(regrets):
-    # 计算每个方案的最大后悔值
-    max_regrets = np.max(regrets, axis=1)
-    # 选择最大后悔值最小的方案
-    best_choice = np.argmin(max_regrets)
-    return best_choice, max_regrets
+# 性能测试：逐个矩阵循环 vs 批量向量化
+def benchmark(k=100000, m=3, n=4, seed=0):
+    rng = np.random.default_rng(seed)
+    payoffs = rng.integers(-200, 200, size=(k, m, n)).astype(float)
+
+    start = time.perf_counter()
+    loop_choices = np.empty(k, dtype=int)
+    for idx in range(k):
+        loop_choices[idx], _ = regret_criterion(_calculate_regrets_loop(payoffs[idx]))
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _, _, batch_choices = batch_regret_criterion(payoffs)
+    batch_time = time.perf_counter() - start
+
+    assert np.array_equal(loop_choices, batch_choices)
+    print(f"k={k}, m={m}, n={n}")
+    print(f"逐个矩阵循环: {loop_time:.3f}s")
+    print(f"批量向量化:   {batch_time:.3f}s (加速 {loop_time / batch_time:.1f} 倍)")
 
 # 根据题目,直接设置收益矩阵
 def example():
@@ -48,20 +183,33 @@ def example():
         print(f"方案 {i+1}: {max_regrets[i]}")
     print(f"\n最优决策: 方案 {best_choice+1}")
 
+    # 其他不确定型决策准则的对照
+    names = {'maximin': '悲观准则', 'maximax': '乐观准则', 'hurwicz': '折衷准则(α=0.5)',
+             'laplace': '等可能准则', 'regret': '后悔值准则'}
+    print("\n各决策准则的最优方案:")
+    for key, (best, _) in evaluate_criteria(payoffs_matrix).items():
+        print(f"{names[key]}: 方案 {best+1}")
+
+    print("\n折衷准则下各方案最优的乐观系数区间:")
+    for i, lo, hi in hurwicz_breakpoints(payoffs_matrix):
+        print(f"方案 {i+1}: α ∈ [{lo:.4f}, {hi:.4f}]")
+
 # 调用函数
 def main():
-    # 手动输入收益矩阵
-    print("请输入方案数量 m:")
-    m = int(input())
-    print("请输入状态数量 n:")
-    n = int(input())
-    
-    # 初始化收益矩阵
-    payoffs_matrix = np.zeros((m, n))
-    
-    for i in range(0, m):
-        for j in range(0, n):
-            payoffs_matrix[i][j] = int(input())
+    # 从文件读入收益矩阵，或逐行手动输入
+    print("请输入收益矩阵文件路径(CSV/.npy/.ndjson)，直接回车则手动输入:")
+    path = input().strip()
+    if path:
+        # 延迟导入，payoff_io 本身依赖本模块的计算函数
+        from payoff_io import load_payoffs
+        payoffs_matrix = load_payoffs(path)
+    else:
+        print("请输入方案数量 m:")
+        m = int(input())
+        print("请依次输入每个方案在各状态下的收益(一行一个方案，数值用空格或逗号分隔):")
+        payoffs_matrix = np.array(
+            [[float(v) for v in input().replace(',', ' ').split()] for _ in range(m)]
+        )
             
     # 计算后悔值
     regrets = calculate_regrets(payoffs_matrix)
@@ -83,10 +231,13 @@ if __name__ == "__main__":
     print("选择运行模式:")
     print("1. 手动输入数据")
     print("2. 使用题目给定的例子")
+    print("3. 批量计算性能测试")
     choice = int(input())
     
     if choice == 1:
         main()
+    elif choice == 3:
+        benchmark()
     else:
         example()
     
\ No newline at end of file
@@ -1,3 +1,7 @@
+import sys
+import time
+
+import numpy as np
 import pandas as pd
 
 # 定义参数
@@ -23,21 +27,177 @@ def calculate_expected_profit(production):
         expected_profit += profit * prob
     return expected_profit
 
-# 评估所有可能的生产量
-production_levels = [7000, 8000, 9000, 10000]
-results = []
+# 将需求分布整理为按需求量升序排列的数组
+def _sorted_support(distribution):
+    if isinstance(distribution, dict):
+        demand = np.fromiter(distribution.keys(), dtype=float)
+        probs = np.fromiter(distribution.values(), dtype=float)
+    else:
+        demand, probs = (np.asarray(a, dtype=float) for a in distribution)
+    order = np.argsort(demand, kind='stable')
+    demand, probs = demand[order], probs[order]
+    return demand, probs / probs.sum()
+
+# 一次性计算所有候选生产量下的期望利润
+def expected_profit_curve(distribution, unit_profit, unit_loss, candidates=None):
+    """
+    需求支撑点只排序一次，用累积概率和部分期望 E[D; D<=q] 得到任意生产量的期望利润，
+    总复杂度 O(n log n)
+    参数:
+        distribution: {需求量: 概率} 字典，或 (需求量数组, 概率数组)
+        unit_profit: 售出时的单位利润
+        unit_loss: 未售出时的单位损失
+        candidates: 候选生产量，默认取全部需求支撑点
+    返回:
+        candidates: 候选生产量数组
+        expected_profits: 对应的期望利润数组
+    """
+    demand, probs = _sorted_support(distribution)
+    candidates = demand if candidates is None else np.asarray(candidates, dtype=float)
+    return candidates, _profit_curve(demand, probs, unit_profit, unit_loss, candidates)
+
+# 已排序、已归一化的需求分布下各候选生产量的期望利润
+def _profit_curve(demand, probs, unit_profit, unit_loss, candidates):
+    # 累积概率 P(D<=d) 与部分期望 E[D; D<=d]，前面补 0 便于按位置取值
+    cum_prob = np.concatenate(([0.0], np.cumsum(probs)))
+    cum_mean = np.concatenate(([0.0], np.cumsum(demand * probs)))
+
+    idx = np.searchsorted(demand, candidates, side='right')
+    # 期望销量 E[min(D, q)] = E[D; D<=q] + q * P(D>q)
+    expected_sales = cum_mean[idx] + candidates * (1 - cum_prob[idx])
+    # 期望剩余量 E[(q-D)+] = q - E[min(D, q)]
+    expected_left = candidates - expected_sales
+    return unit_profit * expected_sales - unit_loss * expected_left
+
+# 临界分位数法求最优生产量
+def solve_newsvendor(distribution, unit_profit, unit_loss):
+    """
+    最优生产量是使 P(D<=q) >= 单位利润 / (单位利润 + 单位损失) 的最小 q
+    参数:
+        distribution: {需求量: 概率} 字典、(需求量数组, 概率数组)，
+                      或 scipy.stats 的连续分布对象(需提供 ppf 和 expect 方法)
+        unit_profit: 售出时的单位利润
+        unit_loss: 未售出时的单位损失
+    返回:
+        optimal_production: 最优生产量
+        expected_profit: 最优生产量下的期望利润
+    """
+    critical_ratio = unit_profit / (unit_profit + unit_loss)
+
+    if hasattr(distribution, 'ppf'):
+        # 连续分布: 直接取分位数，期望销量用分布自带的数值积分
+        q = float(distribution.ppf(critical_ratio))
+        expected_sales = distribution.expect(lambda x: np.minimum(x, q))
+        return q, unit_profit * expected_sales - unit_loss * (q - expected_sales)
+
+    demand, probs = _sorted_support(distribution)
+    # 留出浮点累加误差，避免累积概率恰好等于临界值时跳到下一个支撑点
+    idx = np.searchsorted(np.cumsum(probs), critical_ratio - 1e-12, side='left')
+    q = demand[min(idx, len(demand) - 1)]
+    expected_profit = _profit_curve(demand, probs, unit_profit, unit_loss, np.array([q]))
+    return q, expected_profit[0]
+
+# 多个SKU的报童模型批量求解
+def batch_newsvendor(unit_profits, unit_losses, demands, probs):
+    """
+    需求支撑点个数相同的SKU组成一个 (SKU数, 支撑点数) 数组，按行排序和累积，
+    各SKU的计算与 solve_newsvendor 完全相同，结果逐位一致
+    参数:
+        unit_profits: (k,) 各SKU售出时的单位利润
+        unit_losses: (k,) 各SKU未售出时的单位损失
+        demands: 长度为 k 的需求量序列列表(各SKU长度可以不同)，或 (k, s) 数组
+        probs: 与 demands 形状对应的概率，各SKU内部会自动归一化
+               同一SKU内的需求支撑点应互不相同
+    返回:
+        optimal_production: (k,) 各SKU的最优生产量
+        expected_profits: (k,) 对应的期望利润
+    """
+    unit_profits = np.asarray(unit_profits, dtype=float)
+    unit_losses = np.asarray(unit_losses, dtype=float)
+    k = len(unit_profits)
+    lengths = np.array([len(d) for d in demands])
+    if len(lengths) != k or np.any(lengths == 0):
+        raise ValueError("每个SKU都需要非空的需求分布")
+
+    critical_ratio = unit_profits / (unit_profits + unit_losses)
+    q = np.empty(k)
+    expected_profits = np.empty(k)
+    for n in np.unique(lengths):
+        skus = np.flatnonzero(lengths == n)
+        rows = np.arange(len(skus))
+        demand = np.array([demands[i] for i in skus], dtype=float).reshape(len(skus), n)
+        prob = np.array([probs[i] for i in skus], dtype=float).reshape(len(skus), n)
+
+        order = np.argsort(demand, axis=1, kind='stable')
+        demand = np.take_along_axis(demand, order, axis=1)
+        prob = np.take_along_axis(prob, order, axis=1)
+        prob = prob / prob.sum(axis=1, keepdims=True)
+        # 累积和在各行内独立计算，误差不随SKU数量增长
+        cum_prob = np.cumsum(prob, axis=1)
+        cum_mean = np.cumsum(demand * prob, axis=1)
 
-for prod in production_levels:
-    exp_profit = calculate_expected_profit(prod)
-    results.append({
-        '生产量(个)': prod,
-        '期望利润(元)': round(exp_profit, 2)
+        # 各行首个 P(D<=d) 达到临界分位数的位置，与 searchsorted(side='left') 相同
+        reached = cum_prob >= (critical_ratio[skus] - 1e-12)[:, None]
+        pos = np.where(reached.any(axis=1), reached.argmax(axis=1), n - 1)
+
+        q[skus] = demand[rows, pos]
+        expected_sales = cum_mean[rows, pos] + q[skus] * (1 - cum_prob[rows, pos])
+        expected_profits[skus] = (unit_profits[skus] * expected_sales
+                                  - unit_losses[skus] * (q[skus] - expected_sales))
+    return q, expected_profits
+
+# 批量结果整理为DataFrame，仅用于展示
+def batch_report(optimal_production, expected_profits, sku_names=None):
+    return pd.DataFrame({
+        '最优生产量(个)': optimal_production,
+        '期望利润(元)': np.round(expected_profits, 2)
+    }, index=sku_names)
+
+# 性能测试：逐个SKU求解 vs 批量求解
+def benchmark(num_skus=10000, max_support=50, seed=0):
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(1, max_support + 1, size=num_skus)
+    demands = [np.sort(rng.choice(20000, size=n, replace=False)).astype(float) for n in lengths]
+    probs = [rng.random(n) for n in lengths]
+    profits = rng.uniform(5, 50, size=num_skus)
+    losses = rng.uniform(1, 20, size=num_skus)
+
+    start = time.perf_counter()
+    loop_q, loop_profits = np.array([solve_newsvendor((d, p), up, ul)
+                                     for d, p, up, ul in zip(demands, probs, profits, losses)]).T
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch_q, batch_profits = batch_newsvendor(profits, losses, demands, probs)
+    batch_time = time.perf_counter() - start
+
+    assert np.array_equal(loop_q, batch_q)
+    assert np.array_equal(loop_profits, batch_profits)
+    print(f"SKU数量: {num_skus}, 每个SKU至多 {max_support} 个需求支撑点")
+    print(f"逐个求解: {loop_time:.3f}s, {num_skus / loop_time:.0f} SKU/秒")
+    print(f"批量求解: {batch_time:.3f}s, {num_skus / batch_time:.0f} SKU/秒")
+
+if __name__ == "__main__":
+    # 评估所有可能的生产量
+    production_levels = [7000, 8000, 9000, 10000]
+    _, exp_profits = expected_profit_curve(sales_distribution, unit_profit, unit_loss,
+                                           production_levels)
+
+    # 创建DataFrame显示结果
+    df = pd.DataFrame({
+        '生产量(个)': production_levels,
+        '期望利润(元)': np.round(exp_profits, 2)
     })
+    print(df)
+
+    # 找出最优生产量
+    best = np.argmax(exp_profits)
+    print(f"\n最优生产量为{production_levels[best]}个，期望利润为{round(exp_profits[best], 2)}元")
 
-# 创建DataFrame显示结果
-df = pd.DataFrame(results)
-print(df)
+    # 临界分位数法直接求解
+    q, exp_profit = solve_newsvendor(sales_distribution, unit_profit, unit_loss)
+    print(f"临界分位数法: 最优生产量为{q:.0f}个，期望利润为{exp_profit:.2f}元")
 
-# 找出最优生产量
-optimal = df.loc[df['期望利润(元)'].idxmax()]
-print(f"\n最优生产量为{optimal['生产量(个)']}个，期望利润为{optimal['期望利润(元)']}元")
+    if '--bench' in sys.argv:
+        print()
+        benchmark()
@@ -1,55 +1,118 @@
 import numpy as np
 
-# 先验概率
-P_theta = np.array([0.3, 0.4, 0.3])
-
-# 条件概率矩阵 P(H|theta)
-P_H_theta = np.array([
-    [0.6, 0.2, 0.2],  # H1
-    [0.3, 0.5, 0.2],  # H2
-    [0.1, 0.3, 0.6]   # H3
-])
-
-# 联合概率 P(H, theta) = P(H|theta)*P(theta)
-P_joint = P_H_theta * P_theta
-
-# 边际概率 P(H)
-P_H = P_joint.sum(axis=1)
-
-# 后验概率 P(theta|H) = P(H,theta)/P(H)
-P_theta_H = (P_joint.T / P_H).T
-
-# 收益矩阵
-profit = np.array([
-    [50, 20, -20],
-    [30, 25, -10],
-    [10, 10, 10]
-])
-
-# 计算每种调查结果下的最优决策
-results = {}
-for i, H in enumerate(['H1', 'H2', 'H3']):
-    # 计算期望收益
-    exp_profit = profit @ P_theta_H[i]
-    best_choice = np.argmax(exp_profit)
-    results[H] = {
-        '后验概率': P_theta_H[i],
-        '期望收益': exp_profit,
-        '最优决策': ['大型设备', '中型设备', '小型设备'][best_choice],
-        '最大期望收益': exp_profit[best_choice]
+# 贝叶斯预后验分析
+def preposterior_analysis(prior, likelihood, payoff):
+    """
+    一次矩阵运算完成后验概率、各调查结果下的最优决策以及信息价值的计算
+    参数:
+        prior: (s,) 各状态的先验概率 P(theta)
+        likelihood: (h, s) 条件概率矩阵 P(H|theta)，每行一个调查结果；
+                    也可以是 (k, h, s)，表示 k 个候选调查方案
+        payoff: (a, s) 收益矩阵，每行一个方案
+    返回:
+        dict:
+            P_H: 各调查结果的边际概率
+            posterior: 后验概率 P(theta|H)，概率为 0 的调查结果取先验概率
+            expected_profit: 各调查结果下每个方案的期望收益
+            best_action: 各调查结果下的最优方案下标
+            EV_sample: 考虑调查后的总体期望收益
+            EV_prior: 不做调查时的最大期望收益
+            EVPI: 完全信息期望价值
+            EVSI: 样本信息期望价值
+    """
+    prior = np.asarray(prior, dtype=float)
+    likelihood = np.asarray(likelihood, dtype=float)
+    payoff = np.asarray(payoff, dtype=float)
+
+    # 联合概率 P(H, theta) 与边际概率 P(H)
+    joint = likelihood * prior
+    P_H = joint.sum(axis=-1)
+
+    # 后验概率，概率为 0 的调查结果不提供信息，保留先验
+    posterior = np.divide(joint, P_H[..., None], out=np.broadcast_to(prior, joint.shape).copy(),
+                          where=P_H[..., None] > 0)
+
+    # 各调查结果下每个方案的期望收益及最优决策
+    expected_profit = posterior @ payoff.T
+    best_action = np.argmax(expected_profit, axis=-1)
+    best_profit = np.take_along_axis(expected_profit, best_action[..., None], axis=-1)[..., 0]
+
+    # 信息价值
+    prior_profit = payoff @ prior
+    EV_prior = prior_profit.max()
+    EV_perfect = prior @ payoff.max(axis=0)
+    EV_sample = (P_H * best_profit).sum(axis=-1)
+
+    return {
+        'P_H': P_H,
+        'posterior': posterior,
+        'expected_profit': expected_profit,
+        'best_action': best_action,
+        'EV_sample': EV_sample,
+        'EV_prior': EV_prior,
+        'EVPI': EV_perfect - EV_prior,
+        'EVSI': EV_sample - EV_prior,
     }
 
-# 输出结果
-print("后验概率分布:")
-for H in results:
-    print(f"{H}: θ1={results[H]['后验概率'][0]:.3f}, θ2={results[H]['后验概率'][1]:.3f}, θ3={results[H]['后验概率'][2]:.3f}")
+# 按样本信息价值为候选调查方案排序
+def rank_surveys(prior, likelihoods, payoff, costs=None):
+    """
+    参数:
+        likelihoods: (k, h, s) 候选调查方案的条件概率矩阵
+        costs: (k,) 各调查方案的费用，默认为 0
+    返回:
+        order: 按净价值 EVSI - 费用从高到低排列的方案下标
+        net_value: (k,) 各方案的净价值
+    """
+    result = preposterior_analysis(prior, likelihoods, payoff)
+    net_value = result['EVSI'] - (0 if costs is None else np.asarray(costs, dtype=float))
+    return np.argsort(-net_value, kind='stable'), net_value
+
+if __name__ == "__main__":
+    # 先验概率
+    P_theta = np.array([0.3, 0.4, 0.3])
+
+    # 条件概率矩阵 P(H|theta)
+    P_H_theta = np.array([
+        [0.6, 0.2, 0.2],  # H1
+        [0.3, 0.5, 0.2],  # H2
+        [0.1, 0.3, 0.6]   # H3
+    ])
+
+    # 收益矩阵
+    profit = np.array([
+        [50, 20, -20],
+        [30, 25, -10],
+        [10, 10, 10]
+    ])
+
+    analysis = preposterior_analysis(P_theta, P_H_theta, profit)
+
+    # 整理每种调查结果下的最优决策
+    results = {}
+    for i, H in enumerate(['H1', 'H2', 'H3']):
+        exp_profit = analysis['expected_profit'][i]
+        best_choice = analysis['best_action'][i]
+        results[H] = {
+            '后验概率': analysis['posterior'][i],
+            '期望收益': exp_profit,
+            '最优决策': ['大型设备', '中型设备', '小型设备'][best_choice],
+            '最大期望收益': exp_profit[best_choice]
+        }
+
+    # 输出结果
+    print("后验概率分布:")
+    for H in results:
+        print(f"{H}: θ1={results[H]['后验概率'][0]:.3f}, θ2={results[H]['后验概率'][1]:.3f}, θ3={results[H]['后验概率'][2]:.3f}")
 
-print("\n各调查结果下的最优决策:")
-for H in results:
-    print(f"当调查结果为{H}时:")
-    print(f"  期望收益: 大型={results[H]['期望收益'][0]:.2f}, 中型={results[H]['期望收益'][1]:.2f}, 小型={results[H]['期望收益'][2]:.2f}")
-    print(f"  最优决策: {results[H]['最优决策']}, 期望收益={results[H]['最大期望收益']:.2f}万元")
+    print("\n各调查结果下的最优决策:")
+    for H in results:
+        print(f"当调查结果为{H}时:")
+        print(f"  期望收益: 大型={results[H]['期望收益'][0]:.2f}, 中型={results[H]['期望收益'][1]:.2f}, 小型={results[H]['期望收益'][2]:.2f}")
+        print(f"  最优决策: {results[H]['最优决策']}, 期望收益={results[H]['最大期望收益']:.2f}万元")
 
-# 计算整体期望收益
-total_exp_profit = sum(results[H]['最大期望收益'] * P_H[i] for i, H in enumerate(results))
-print(f"\n考虑调查后的总体期望收益: {total_exp_profit:.2f}万元")
+    # 整体期望收益与信息价值
+    print(f"\n考虑调查后的总体期望收益: {analysis['EV_sample']:.2f}万元")
+    print(f"不做调查时的最大期望收益: {analysis['EV_prior']:.2f}万元")
+    print(f"样本信息期望价值 EVSI: {analysis['EVSI']:.2f}万元")
+    print(f"完全信息期望价值 EVPI: {analysis['EVPI']:.2f}万元")
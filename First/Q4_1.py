@@ -1,12 +1,11 @@
-import numpy as np
-
-# 转移矩阵
-P1 = np.array([[0.80, 0.15, 0.05], [0.20, 0.45, 0.35], [0.30, 0.40, 0.30]])
-P2 = np.array([[0.90, 0.05, 0.05], [0.15, 0.75, 0.10], [0.10, 0.15, 0.75]])
-P3 = np.array([[0.90, 0.05, 0.05], [0.10, 0.80, 0.10], [0.10, 0.15, 0.75]])
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 
-# 初始市场份额（假设均等）
-initial = np.array([1/3, 1/3, 1/3])
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import gmres
 
 # 计算稳态分布
 def steady_state(P):
@@ -15,34 +14,203 @@ def steady_state(P):
     steady = steady / steady.sum()
     return steady.real
 
-steady1 = steady_state(P1)
-steady2 = steady_state(P2)
-steady3 = steady_state(P3)
-
-# 总销量和利润
-total_sales = 1000  # 万件
-profit_per = 1      # 元/件
-costs = [150, 40, 30]  # 万
-
-# 计算长期利润
-long_term_profit = [
-    steady1[0] * total_sales * profit_per - costs[0],
-    steady2[0] * total_sales * profit_per - costs[1],
-    steady3[0] * total_sales * profit_per - costs[2]
-]
-
-# 最优选择
-best = np.argmax(long_term_profit)
-options = ["发放债券", "广告宣传", "优质服务"]
-
-# 输出结果
-print("稳态市场份额分布:")
-print(f"方案1: A={steady1[0]:.3f}, B={steady1[1]:.3f}, C={steady1[2]:.3f}")
-print(f"方案2: A={steady2[0]:.3f}, B={steady2[1]:.3f}, C={steady2[2]:.3f}")
-print(f"方案3: A={steady3[0]:.3f}, B={steady3[1]:.3f}, C={steady3[2]:.3f}")
-
-print("\n长期利润(万元):")
-for i in range(3):
-    print(f"{options[i]}: {long_term_profit[i]:.2f}")
-
-print(f"\n最优方案是: {options[best]}, 长期利润为: {long_term_profit[best]:.2f}万元")
+# 统计马尔可夫链的闭类个数
+def count_closed_classes(P):
+    """
+    闭类即状态转移图中没有出边的强连通分量；
+    闭类多于一个时稳态分布不唯一
+    """
+    P = sparse.csr_matrix(P)
+    n_comp, labels = connected_components(P, directed=True, connection='strong')
+    rows, cols = P.nonzero()
+    leaving = labels[rows] != labels[cols]
+    open_classes = np.unique(labels[rows[leaving]])
+    return n_comp - len(open_classes)
+
+# 适用于大规模稀疏转移矩阵的稳态分布求解
+def stationary_distribution(P, method='gmres', tol=1e-10, maxiter=10000):
+    """
+    求解 pi (I - P) = 0, sum(pi) = 1
+    参数:
+        P: (n, n) 转移矩阵，可以是 NumPy 数组或 scipy.sparse 矩阵
+        method: 'gmres' 用一行全 1 替换 (I - P^T) 的最后一行后以 GMRES 求解；
+                'power' 对 (I + P) / 2 做幂迭代，可处理周期链
+        tol: 收敛容差(GMRES 的相对残差，幂迭代相邻两次的 L1 差)
+        maxiter: 最大迭代次数
+    返回:
+        pi: (n,) 稳态分布
+        info: 求解信息，包括迭代次数、残差 ||pi P - pi||_1 和闭类个数
+    """
+    P = sparse.csr_matrix(P, dtype=float)
+    n = P.shape[0]
+    if P.shape != (n, n):
+        raise ValueError(f"转移矩阵应为方阵，实际形状为 {P.shape}")
+    row_sums = np.asarray(P.sum(axis=1)).ravel()
+    if not np.allclose(row_sums, 1):
+        raise ValueError("转移矩阵每行之和应为 1")
+
+    closed = count_closed_classes(P)
+    if closed > 1:
+        raise ValueError(f"马尔可夫链可约，存在 {closed} 个闭类，稳态分布不唯一")
+
+    PT = P.T.tocsr()
+    iterations = 0
+    if method == 'gmres':
+        # 用归一化条件 sum(pi) = 1 替换最后一个方程，消除奇异性
+        A = (sparse.identity(n, format='csr') - PT)
+        A = sparse.vstack([A[:-1], sparse.csr_matrix(np.ones((1, n)))], format='csr')
+        b = np.zeros(n)
+        b[-1] = 1
+
+        def count(_):
+            nonlocal iterations
+            iterations += 1
+
+        pi, status = gmres(A, b, rtol=tol, maxiter=maxiter, callback=count,
+                           callback_type='pr_norm')
+        if status != 0:
+            raise RuntimeError(f"GMRES 在 {maxiter} 次迭代内未收敛")
+    elif method == 'power':
+        pi = np.full(n, 1 / n)
+        for iterations in range(1, maxiter + 1):
+            # 懒惰链 (I + P) / 2 与原链稳态相同，且消除了周期性
+            new_pi = 0.5 * (pi + PT @ pi)
+            diff = np.abs(new_pi - pi).sum()
+            pi = new_pi
+            if diff < tol:
+                break
+        else:
+            raise RuntimeError(f"幂迭代在 {maxiter} 次迭代内未收敛")
+    else:
+        raise ValueError(f"未知的求解方法: {method}")
+
+    # 去掉数值误差带来的微小负值后重新归一化
+    pi = np.clip(pi, 0, None)
+    pi = pi / pi.sum()
+    info = {
+        'method': method,
+        'iterations': iterations,
+        'residual': float(np.abs(PT @ pi - pi).sum()),
+        'closed_classes': closed,
+    }
+    return pi, info
+
+# 批量求解一组稠密转移矩阵的稳态分布
+def batch_stationary_distributions(P_stack):
+    """
+    对 (k, n, n) 的转移矩阵组同时求解 pi (I - P) = 0, sum(pi) = 1
+    每个矩阵的 (I - P^T) 最后一行替换为全 1 后，用一次批量 np.linalg.solve 求解；
+    组内任一链可约导致方程奇异时抛出 LinAlgError
+    """
+    P_stack = np.asarray(P_stack, dtype=float)
+    k, n, _ = P_stack.shape
+    A = np.eye(n) - np.swapaxes(P_stack, 1, 2)
+    A[:, -1, :] = 1
+    b = np.zeros((k, n, 1))
+    b[:, -1, 0] = 1
+    return np.linalg.solve(A, b)[..., 0]
+
+# 批量评价多个营销方案
+def evaluate_policies(P_stack, costs, margins, workers=None, chunk_size=10000):
+    """
+    参数:
+        P_stack: (k, n, n) 各方案的转移矩阵
+        costs: (k,) 各方案的费用
+        margins: (n,) 或 (k, n) 稳态下各状态对应的收益，如 [总销量*单位利润, 0, 0]
+        workers: 并行进程数，None 或 1 时在当前进程内计算
+        chunk_size: 并行时每个进程一次处理的方案数
+    返回:
+        steady: (k, n) 各方案的稳态分布
+        long_term_profit: (k,) 各方案的长期利润
+        ranking: 按长期利润从高到低排列的方案下标
+    """
+    P_stack = np.asarray(P_stack, dtype=float)
+    k = P_stack.shape[0]
+    if workers is not None and workers > 1 and k > chunk_size:
+        chunks = [P_stack[i:i + chunk_size] for i in range(0, k, chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            steady = np.concatenate(list(pool.map(batch_stationary_distributions, chunks)))
+    else:
+        steady = batch_stationary_distributions(P_stack)
+
+    margins = np.asarray(margins, dtype=float)
+    long_term_profit = np.einsum('kn,kn->k', steady, np.broadcast_to(margins, steady.shape)) \
+        - np.asarray(costs, dtype=float)
+    ranking = np.argsort(-long_term_profit, kind='stable')
+    return steady, long_term_profit, ranking
+
+# 随机生成每行 degree 个非零元的稀疏转移矩阵
+def random_sparse_chain(n, degree=5, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = np.repeat(np.arange(n), degree)
+    cols = rng.integers(0, n, size=n * degree)
+    # 保证相邻状态互通，使链不可约
+    cols[::degree] = (np.arange(n) + 1) % n
+    P = sparse.csr_matrix((rng.random(n * degree), (rows, cols)), shape=(n, n))
+    return sparse.diags(1 / np.asarray(P.sum(axis=1)).ravel()) @ P
+
+# 性能测试：稠密特征分解 vs 稀疏迭代求解
+def benchmark(dense_sizes=(200, 500, 1000), sparse_sizes=(10**5,)):
+    print("状态数      eig(s)   GMRES(s)  幂迭代(s)  最大偏差")
+    for n in dense_sizes:
+        P = random_sparse_chain(n)
+        start = time.perf_counter()
+        ref = steady_state(P.toarray())
+        eig_time = time.perf_counter() - start
+        start = time.perf_counter()
+        pi_gmres, _ = stationary_distribution(P)
+        gmres_time = time.perf_counter() - start
+        start = time.perf_counter()
+        pi_power, _ = stationary_distribution(P, method='power')
+        power_time = time.perf_counter() - start
+        err = max(np.abs(pi_gmres - ref).max(), np.abs(pi_power - ref).max())
+        print(f"{n:<10} {eig_time:8.3f} {gmres_time:9.3f} {power_time:9.3f}   {err:.2e}")
+    for n in sparse_sizes:
+        P = random_sparse_chain(n)
+        start = time.perf_counter()
+        _, info_gmres = stationary_distribution(P)
+        gmres_time = time.perf_counter() - start
+        start = time.perf_counter()
+        _, info_power = stationary_distribution(P, method='power')
+        power_time = time.perf_counter() - start
+        print(f"{n:<10} {'-':>8} {gmres_time:9.3f} {power_time:9.3f}   "
+              f"残差 {info_gmres['residual']:.1e} / {info_power['residual']:.1e}")
+
+if __name__ == "__main__":
+    # 转移矩阵
+    P1 = np.array([[0.80, 0.15, 0.05], [0.20, 0.45, 0.35], [0.30, 0.40, 0.30]])
+    P2 = np.array([[0.90, 0.05, 0.05], [0.15, 0.75, 0.10], [0.10, 0.15, 0.75]])
+    P3 = np.array([[0.90, 0.05, 0.05], [0.10, 0.80, 0.10], [0.10, 0.15, 0.75]])
+
+    # 初始市场份额（假设均等）
+    initial = np.array([1/3, 1/3, 1/3])
+
+    # 总销量和利润
+    total_sales = 1000  # 万件
+    profit_per = 1      # 元/件
+    costs = [150, 40, 30]  # 万
+
+    # 批量计算稳态分布和长期利润，只有A的市场份额带来利润
+    steady, long_term_profit, ranking = evaluate_policies(
+        np.stack([P1, P2, P3]), costs, [total_sales * profit_per, 0, 0])
+    steady1, steady2, steady3 = steady
+
+    # 最优选择
+    best = ranking[0]
+    options = ["发放债券", "广告宣传", "优质服务"]
+
+    # 输出结果
+    print("稳态市场份额分布:")
+    print(f"方案1: A={steady1[0]:.3f}, B={steady1[1]:.3f}, C={steady1[2]:.3f}")
+    print(f"方案2: A={steady2[0]:.3f}, B={steady2[1]:.3f}, C={steady2[2]:.3f}")
+    print(f"方案3: A={steady3[0]:.3f}, B={steady3[1]:.3f}, C={steady3[2]:.3f}")
+
+    print("\n长期利润(万元):")
+    for i in range(3):
+        print(f"{options[i]}: {long_term_profit[i]:.2f}")
+
+    print(f"\n最优方案是: {options[best]}, 长期利润为: {long_term_profit[best]:.2f}万元")
+
+    if '--bench' in sys.argv:
+        print()
+        benchmark()
@@ -1,5 +1,7 @@
 import numpy as np
 
+from mdp import expected_rewards, finite_horizon
+
 # 转移矩阵
 P_no_ad = np.array([[0.8, 0.2], [0.4, 0.6]])
 P_ad = np.array([[0.9, 0.1], [0.7, 0.3]])
@@ -12,18 +14,25 @@ ad_cost = 15        # 广告成本
 # 正确表示为概率分布 [0, 1]，表示有100%概率处于滞销状态
 initial_state = np.array([0, 1])  # 0=畅销, 1=滞销
 
+# 逐年产生状态概率分布的生成器，只在需要逐年轨迹时使用
+def iter_yearly_states(P, initial_state, years=None):
+    state = initial_state
+    year = 0
+    while years is None or year < years:
+        # 先转移状态，再计算当年利润
+        state = state @ P
+        year += 1
+        yield state
+
 # 使用马尔可夫链计算期望利润，并返回每年的状态概率
 def calculate_expected_profit(P, years=4, initial_state=np.array([0, 1]), ad=False):
-    state = initial_state.copy()  # 初始状态向量
     total_profit = 0
     
     yearly_states = [initial_state.copy()]  # 记录每年的状态概率
     yearly_profits = []  # 记录每年的期望利润
     
-    for year in range(years):
-        # 状态转移 (先转移状态，再计算当年利润)
-        state = state @ P
-        yearly_states.append(state.copy())
+    for state in iter_yearly_states(P, initial_state, years):
+        yearly_states.append(state)
         
         # 计算当前状态的期望利润: 状态概率 * 对应利润
         current_profit = state[0] * profit[0] + state[1] * profit[1]
@@ -35,40 +44,101 @@ def calculate_expected_profit(P, years=4, initial_state=np.array([0, 1]), ad=Fal
     
     return total_profit, yearly_states, yearly_profits
 
-# 计算期望利润和每年状态概率
-exp_no_ad, states_no_ad, profits_no_ad = calculate_expected_profit(P_no_ad, initial_state=initial_state, ad=False)
-exp_ad, states_ad, profits_ad = calculate_expected_profit(P_ad, initial_state=initial_state, ad=True)
-
-# 决策
-should_ad = exp_ad > exp_no_ad
-
-# 输出结果
-print(f"不采用广告的4年期望利润: {exp_no_ad:.2f}万元")
-print(f"采用广告的4年期望利润: {exp_ad:.2f}万元")
-print(f"\n决策建议: {'应该' if should_ad else '不应该'}采用广告措施")
-
-# 输出每年的状态概率分布和利润
-print("\n每年状态概率分布和利润详情:")
-print("=" * 75)
-print("年份   |      不采用广告        |           采用广告           |")
-print("      | 畅销概率 滞销概率 期望利润 | 畅销概率 滞销概率 期望利润    |")
-print("-" * 75)
-
-# 初始年份没有利润，只有状态
-initial_no_ad = states_no_ad[0]
-initial_ad = states_ad[0]
-print(f"初始   | {initial_no_ad[0]:.4f}  {initial_no_ad[1]:.4f}     -   | {initial_ad[0]:.4f}  {initial_ad[1]:.4f}     -   |")
-
-# 第1-4年有状态和利润
-for year in range(1, 5):  # 第1年到第4年
-    # 不采用广告的数据 (注意：利润索引是year-1，因为profits数组从0开始)
-    no_ad_state = states_no_ad[year]
-    no_ad_profit = profits_no_ad[year-1]
-    
-    # 采用广告的数据
-    ad_state = states_ad[year]
-    ad_profit = profits_ad[year-1]
-    
-    print(f"第{year}年  | {no_ad_state[0]:.4f}  {no_ad_state[1]:.4f}  {no_ad_profit:6.2f} | {ad_state[0]:.4f}  {ad_state[1]:.4f}  {ad_profit:6.2f} |")
+# 长期累计期望利润，不保存逐年状态
+def cumulative_expected_profit(P, years, initial_state, reward, discount=1.0, method='power'):
+    """
+    计算 sum_{t=1..years} discount^(t-1) * initial_state @ P^t @ reward
+    参数:
+        P: (n, n) 转移矩阵，或 (k, n, n) 多个策略的转移矩阵
+        years: 年数；method='fundamental' 时可取 None 表示无限期
+        initial_state: (n,) 初始状态概率
+        reward: (n,) 或 (k, n) 每年处于各状态的收益，固定费用可直接从各分量中扣除
+        discount: 折现因子
+        method: 'power' 对增广矩阵 [[discount*P, P@reward], [0, 1]] 做快速幂，O(n^3 log T)；
+                'fundamental' 用折现基本矩阵 (I - discount*P)^(-1)，需要 discount < 1
+    返回:
+        标量或 (k,) 的累计期望利润
+    """
+    P = np.asarray(P, dtype=float)
+    reward = np.broadcast_to(np.asarray(reward, dtype=float), P.shape[:-1])
+    initial_state = np.asarray(initial_state, dtype=float)
+    n = P.shape[-1]
+    # 每年先转移再获利，单年期望收益向量为 P @ reward
+    step_reward = (P @ reward[..., None])[..., 0]
+
+    if method == 'power':
+        if years is None:
+            raise ValueError("快速幂方法需要有限的年数")
+        M = np.zeros(P.shape[:-2] + (n + 1, n + 1))
+        M[..., :n, :n] = discount * P
+        M[..., :n, n] = step_reward
+        M[..., n, n] = 1
+        # [state, 累计利润] 右乘 M 的转置，T 次后末分量即为累计利润
+        return (np.linalg.matrix_power(M, years)[..., :n, n] * initial_state).sum(axis=-1)
+    if method == 'fundamental':
+        if not discount < 1:
+            raise ValueError("基本矩阵方法需要 discount < 1")
+        # sum_{t<T} (discount*P)^t = (I - discount*P)^(-1) (I - (discount*P)^T)
+        tail = step_reward if years is None else \
+            step_reward - (np.linalg.matrix_power(discount * P, years) @ step_reward[..., None])[..., 0]
+        return (np.linalg.solve(np.eye(n) - discount * P, tail[..., None])[..., 0]
+                * initial_state).sum(axis=-1)
+    raise ValueError(f"未知的计算方法: {method}")
+
+if __name__ == "__main__":
+    # 计算期望利润和每年状态概率
+    exp_no_ad, states_no_ad, profits_no_ad = calculate_expected_profit(P_no_ad, initial_state=initial_state, ad=False)
+    exp_ad, states_ad, profits_ad = calculate_expected_profit(P_ad, initial_state=initial_state, ad=True)
+
+    # 决策
+    should_ad = exp_ad > exp_no_ad
+
+    # 输出结果
+    print(f"不采用广告的4年期望利润: {exp_no_ad:.2f}万元")
+    print(f"采用广告的4年期望利润: {exp_ad:.2f}万元")
+    print(f"\n决策建议: {'应该' if should_ad else '不应该'}采用广告措施")
+
+    # 输出每年的状态概率分布和利润
+    print("\n每年状态概率分布和利润详情:")
+    print("=" * 75)
+    print("年份   |      不采用广告        |           采用广告           |")
+    print("      | 畅销概率 滞销概率 期望利润 | 畅销概率 滞销概率 期望利润    |")
+    print("-" * 75)
+
+    # 初始年份没有利润，只有状态
+    initial_no_ad = states_no_ad[0]
+    initial_ad = states_ad[0]
+    print(f"初始   | {initial_no_ad[0]:.4f}  {initial_no_ad[1]:.4f}     -   | {initial_ad[0]:.4f}  {initial_ad[1]:.4f}     -   |")
+
+    # 第1-4年有状态和利润
+    for year in range(1, 5):  # 第1年到第4年
+        # 不采用广告的数据 (注意：利润索引是year-1，因为profits数组从0开始)
+        no_ad_state = states_no_ad[year]
+        no_ad_profit = profits_no_ad[year-1]
+
+        # 采用广告的数据
+        ad_state = states_ad[year]
+        ad_profit = profits_ad[year-1]
+
+        print(f"第{year}年  | {no_ad_state[0]:.4f}  {no_ad_state[1]:.4f}  {no_ad_profit:6.2f} | {ad_state[0]:.4f}  {ad_state[1]:.4f}  {ad_profit:6.2f} |")
+
+    print("=" * 75)
+
+    # 动态规划: 每年根据当年所处状态决定是否做广告
+    P_actions = np.stack([P_no_ad, P_ad])
+    R = expected_rewards(P_actions, profit, [0, ad_cost])
+    V, policy = finite_horizon(P_actions, R, horizon=4)
+    actions = ['不做广告', '做广告']
+    state_names = ['畅销', '滞销']
+
+    print("\n逐年最优策略(动态规划):")
+    for year in range(4):
+        choice = ", ".join(f"{state_names[i]}时{actions[policy[year, i]]}" for i in range(2))
+        print(f"第{year+1}年: {choice}")
+    print(f"从滞销出发的4年最大期望利润: {initial_state @ V[0]:.2f}万元")
 
-print("=" * 75)
+    # 长期累计利润: 快速幂不保存逐年状态
+    years_long = 1000000
+    long_no_ad, long_ad = cumulative_expected_profit(
+        np.stack([P_no_ad, P_ad]), years_long, initial_state, [profit, profit - ad_cost])
+    print(f"\n{years_long}年累计期望利润: 不采用广告 {long_no_ad:.2f}万元, 采用广告 {long_ad:.2f}万元")
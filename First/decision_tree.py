@@ -0,0 +1,204 @@
+"""
+决策树的逆向归纳(回溯)求解
+节点可以带状态键 key，键相同的子树只计算一次；
+求解过程用显式栈做后序遍历，不受递归深度限制
+"""
+import gc
+import sys
+import time
+
+import numpy as np
+
+DECISION = 'decision'
+CHANCE = 'chance'
+TERMINAL = 'terminal'
+
+
+class Node:
+    """
+    决策树节点
+    参数:
+        kind: 节点类型，DECISION(决策点)、CHANCE(机会点) 或 TERMINAL(结果点)
+        branches: 决策点为 [(方案名, 子节点), ...]，机会点为 [(结果名, 概率, 子节点), ...]
+        payoff: 到达该节点时获得的收益(费用记为负数)，结果点的值即为该收益
+        key: 状态键，可哈希；键相同的节点视为同一子树，只计算一次
+    """
+    __slots__ = ('kind', 'branches', 'payoff', 'key')
+
+    def __init__(self, kind, branches=(), payoff=0.0, key=None):
+        if kind not in (DECISION, CHANCE, TERMINAL):
+            raise ValueError(f"未知的节点类型: {kind}")
+        if kind != TERMINAL and not branches:
+            raise ValueError(f"{kind} 节点至少需要一个分支")
+        self.kind = kind
+        self.branches = list(branches)
+        self.payoff = payoff
+        self.key = key
+
+
+def decision(branches, payoff=0.0, key=None):
+    return Node(DECISION, branches, payoff, key)
+
+
+def chance(branches, payoff=0.0, key=None):
+    return Node(CHANCE, branches, payoff, key)
+
+
+def terminal(payoff, key=None):
+    return Node(TERMINAL, payoff=payoff, key=key)
+
+
+def _cache_key(node):
+    # 没有状态键的节点按对象本身缓存，共享的子树对象同样只算一次
+    return node if node.key is None else node.key
+
+
+def _children(node):
+    if node.kind == DECISION:
+        return [child for _, child in node.branches]
+    return [child for _, _, child in node.branches]
+
+
+def rollback(root):
+    """
+    逆向归纳求解决策树
+    参数:
+        root: 根节点
+    返回:
+        value: 根节点的期望值
+        policy: {节点状态键: 最优方案名}，只包含决策点
+        stats: 统计信息，包括计算的节点数、缓存命中次数和命中率
+    """
+    values = {}
+    policy = {}
+    hits = 0
+    evaluated = 0
+
+    stack = [(root, False)]
+    while stack:
+        node, expanded = stack.pop()
+        key = _cache_key(node)
+        if not expanded:
+            if key in values:
+                hits += 1
+                continue
+            if node.kind == TERMINAL:
+                values[key] = node.payoff
+                evaluated += 1
+                continue
+            # 先压入自身，再压入子节点，子节点全部出栈计算后才回到自身
+            stack.append((node, True))
+            stack.extend((child, False) for child in _children(node))
+            continue
+
+        if key in values:
+            # 同一状态在展开期间已经由另一路径算出
+            continue
+        if node.kind == DECISION:
+            labels = [label for label, _ in node.branches]
+            child_values = [values[_cache_key(child)] for _, child in node.branches]
+            best = max(range(len(child_values)), key=child_values.__getitem__)
+            policy[key] = labels[best]
+            values[key] = node.payoff + child_values[best]
+        else:
+            values[key] = node.payoff + sum(
+                prob * values[_cache_key(child)] for _, prob, child in node.branches
+            )
+        evaluated += 1
+
+    lookups = hits + evaluated
+    stats = {
+        'nodes_evaluated': evaluated,
+        'cache_hits': hits,
+        'hit_rate': hits / lookups if lookups else 0.0,
+    }
+    return values[_cache_key(root)], policy, stats
+
+
+def survey_tree(prior, likelihood, payoff, actions, survey_cost=0.0):
+    """
+    按 Q3_2 的"先调查、再决策"问题构造两阶段决策树
+    行动后的机会点以 (方案, 后验概率) 为状态键，后验相同的路径共享子树
+    """
+    prior = np.asarray(prior, dtype=float)
+    likelihood = np.asarray(likelihood, dtype=float)
+    payoff = np.asarray(payoff, dtype=float)
+    # 结果点按 (方案, 状态) 共用
+    leaves = [[terminal(payoff[a, s]) for s in range(payoff.shape[1])]
+              for a in range(payoff.shape[0])]
+
+    def act(belief):
+        belief_key = tuple(np.round(belief, 12))
+        return decision(
+            [(actions[a], chance([(f"θ{s+1}", belief[s], leaves[a][s])
+                                  for s in range(len(belief)) if belief[s] > 0],
+                                 key=(a, belief_key)))
+             for a in range(len(actions))],
+            key=('act', belief_key)
+        )
+
+    joint = likelihood * prior
+    P_H = joint.sum(axis=1)
+    survey = chance([(f"H{h+1}", P_H[h], act(joint[h] / P_H[h]))
+                     for h in range(len(P_H)) if P_H[h] > 0],
+                    payoff=-survey_cost)
+    return decision([('不调查', act(prior)), ('调查', survey)], key='root')
+
+
+# 性能测试: 多阶段重复状态的大树
+def benchmark(stages=10):
+    """
+    每阶段先决策(扩张或维持)，再由市场上升或下降决定下一阶段的状态，
+    状态只取决于 (阶段, 市场水平)，完整展开后节点数约为 4^stages
+    """
+    rng = np.random.default_rng(0)
+    up_prob = rng.uniform(0.3, 0.7, size=stages).tolist()
+
+    def build(t, level, keyed):
+        # 构造时不共享节点对象，只依靠状态键合并；递归深度仅为阶段数
+        if t == stages:
+            return terminal(10.0 * level, key=(t, level) if keyed else None)
+        branches = []
+        for name, gain, cost in (('扩张', 2.0, 5.0), ('维持', 1.0, 0.0)):
+            outcomes = [('上升', up_prob[t], build(t + 1, level + 1, keyed)),
+                        ('下降', 1 - up_prob[t], build(t + 1, level - 1, keyed))]
+            branches.append((name, chance(outcomes, payoff=gain * level - cost)))
+        return decision(branches, key=(t, level) if keyed else None)
+
+    for keyed in (False, True):
+        # 大量小对象会频繁触发循环垃圾回收，构造期间暂时关闭，构造完成后冻结不再扫描
+        gc.disable()
+        root = build(0, 0, keyed)
+        gc.freeze()
+        gc.enable()
+        start = time.perf_counter()
+        value, policy, stats = rollback(root)
+        solve_time = time.perf_counter() - start
+        print(f"{'带状态键' if keyed else '无状态键'}: 求解耗时 {solve_time:.3f}s, 根节点期望值 {value:.4f}")
+        print(f"  计算节点数 {stats['nodes_evaluated']}, 缓存命中 {stats['cache_hits']} 次, "
+              f"命中率 {stats['hit_rate']:.2%}")
+        del root, policy
+        gc.unfreeze()
+
+
+if __name__ == "__main__":
+    # Q3_2 的两阶段问题
+    P_theta = np.array([0.3, 0.4, 0.3])
+    P_H_theta = np.array([
+        [0.6, 0.2, 0.2],
+        [0.3, 0.5, 0.2],
+        [0.1, 0.3, 0.6]
+    ])
+    profit = np.array([
+        [50, 20, -20],
+        [30, 25, -10],
+        [10, 10, 10]
+    ])
+    root = survey_tree(P_theta, P_H_theta, profit, ['大型设备', '中型设备', '小型设备'])
+    value, policy, stats = rollback(root)
+    print(f"决策树期望收益: {value:.2f}万元, 根节点决策: {policy['root']}")
+    print(f"缓存命中率: {stats['hit_rate']:.2%}")
+
+    if '--bench' in sys.argv:
+        print()
+        benchmark()
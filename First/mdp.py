@@ -0,0 +1,147 @@
+"""
+马尔可夫决策过程求解
+有限阶段用逆向归纳，无限阶段用值迭代或策略迭代，Bellman 更新对所有行动和状态同时进行
+约定: P 为 (a, s, s) 的各行动转移矩阵，R 为 (a, s) 的各行动在各状态下的期望单期收益
+"""
+import sys
+import time
+
+import numpy as np
+
+
+def expected_rewards(P, state_reward, action_cost=0.0):
+    """
+    先转移、再按转移后的状态获得收益的单期期望收益(与 Q4_2 的计算顺序一致)
+    参数:
+        P: (a, s, s) 各行动的转移矩阵
+        state_reward: (s,) 处于各状态时的收益
+        action_cost: 标量或 (a,) 各行动的费用
+    返回:
+        R: (a, s) R[a, i] = sum_j P[a, i, j] * state_reward[j] - action_cost[a]
+    """
+    P = np.asarray(P, dtype=float)
+    cost = np.broadcast_to(np.asarray(action_cost, dtype=float), (P.shape[0],))
+    return P @ np.asarray(state_reward, dtype=float) - cost[:, None]
+
+
+def _check(P, R):
+    P = np.asarray(P, dtype=float)
+    R = np.asarray(R, dtype=float)
+    if P.ndim != 3 or P.shape[1] != P.shape[2]:
+        raise ValueError(f"转移矩阵组应为 (a, s, s)，实际形状为 {P.shape}")
+    if R.shape != P.shape[:2]:
+        raise ValueError(f"收益矩阵应为 {P.shape[:2]}，实际形状为 {R.shape}")
+    return P, R
+
+
+def _bellman(P_flat, R, V, discount):
+    # 转移矩阵组展平为 (a*s, s)，所有行动和状态的更新合成一次矩阵向量乘法
+    return R + discount * (P_flat @ V).reshape(R.shape)
+
+
+def finite_horizon(P, R, horizon, discount=1.0, terminal_value=None):
+    """
+    逆向归纳求有限阶段最优策略
+    参数:
+        P: (a, s, s) 各行动的转移矩阵
+        R: (a, s) 各行动在各状态下的期望单期收益
+        horizon: 阶段数
+        discount: 折现因子
+        terminal_value: (s,) 期末各状态的价值，默认为 0
+    返回:
+        V: (horizon + 1, s) V[t, i] 为第 t 期初处于状态 i 时此后的最大期望总收益
+        policy: (horizon, s) policy[t, i] 为第 t 期处于状态 i 时的最优行动
+    """
+    P, R = _check(P, R)
+    n_states = P.shape[1]
+    V = np.zeros((horizon + 1, n_states))
+    if terminal_value is not None:
+        V[horizon] = terminal_value
+    policy = np.zeros((horizon, n_states), dtype=int)
+    P_flat = P.reshape(-1, n_states)
+    for t in range(horizon - 1, -1, -1):
+        # Q[a, i] = R[a, i] + discount * sum_j P[a, i, j] * V[t+1, j]
+        Q = _bellman(P_flat, R, V[t + 1], discount)
+        policy[t] = np.argmax(Q, axis=0)
+        V[t] = np.max(Q, axis=0)
+    return V, policy
+
+
+def value_iteration(P, R, discount, tol=1e-10, max_iter=100000):
+    """
+    无限阶段折现问题的值迭代
+    返回:
+        V: (s,) 最优价值
+        policy: (s,) 最优平稳策略
+        iterations: 迭代次数
+    """
+    P, R = _check(P, R)
+    if not 0 <= discount < 1:
+        raise ValueError("无限阶段问题需要 0 <= discount < 1")
+    V = np.zeros(P.shape[1])
+    P_flat = P.reshape(-1, P.shape[1])
+    for iterations in range(1, max_iter + 1):
+        Q = _bellman(P_flat, R, V, discount)
+        new_V = Q.max(axis=0)
+        diff = np.abs(new_V - V).max()
+        V = new_V
+        # 保证与最优值的误差不超过 tol
+        if diff * discount < tol * (1 - discount):
+            break
+    else:
+        raise RuntimeError(f"值迭代在 {max_iter} 次迭代内未收敛")
+    return V, np.argmax(_bellman(P_flat, R, V, discount), axis=0), iterations
+
+
+def policy_iteration(P, R, discount, max_iter=1000):
+    """
+    无限阶段折现问题的策略迭代，每轮精确求解当前策略的价值
+    返回:
+        V: (s,) 最优价值
+        policy: (s,) 最优平稳策略
+        iterations: 迭代次数
+    """
+    P, R = _check(P, R)
+    if not 0 <= discount < 1:
+        raise ValueError("无限阶段问题需要 0 <= discount < 1")
+    n_states = P.shape[1]
+    states = np.arange(n_states)
+    P_flat = P.reshape(-1, n_states)
+    policy = np.argmax(R, axis=0)
+    for iterations in range(1, max_iter + 1):
+        # 策略评价: (I - discount * P_pi) V = R_pi
+        V = np.linalg.solve(np.eye(n_states) - discount * P[policy, states],
+                            R[policy, states])
+        Q = _bellman(P_flat, R, V, discount)
+        # 与当前行动同样好时保留当前行动，避免在等值行动间来回切换
+        new_policy = np.where(Q[policy, states] >= Q.max(axis=0) - 1e-12,
+                              policy, np.argmax(Q, axis=0))
+        if np.array_equal(new_policy, policy):
+            break
+        policy = new_policy
+    else:
+        raise RuntimeError(f"策略迭代在 {max_iter} 次迭代内未收敛")
+    return V, policy, iterations
+
+
+def benchmark(n_actions=10, n_states=1000, horizon=100, seed=0):
+    rng = np.random.default_rng(seed)
+    P = rng.random((n_actions, n_states, n_states))
+    P /= P.sum(axis=2, keepdims=True)
+    R = rng.normal(size=(n_actions, n_states))
+
+    start = time.perf_counter()
+    finite_horizon(P, R, horizon, discount=0.95)
+    print(f"有限阶段: {n_actions} 个行动, {n_states} 个状态, {horizon} 期, "
+          f"耗时 {time.perf_counter() - start:.3f}s")
+    start = time.perf_counter()
+    _, policy_vi, it_vi = value_iteration(P, R, 0.95)
+    print(f"值迭代: {it_vi} 次迭代, 耗时 {time.perf_counter() - start:.3f}s")
+    start = time.perf_counter()
+    _, policy_pi, it_pi = policy_iteration(P, R, 0.95)
+    print(f"策略迭代: {it_pi} 次迭代, 耗时 {time.perf_counter() - start:.3f}s")
+    print(f"两种方法策略一致: {np.array_equal(policy_vi, policy_pi)}")
+
+
+if __name__ == "__main__":
+    benchmark(*(int(arg) for arg in sys.argv[1:4]))
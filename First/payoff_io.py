@@ -0,0 +1,117 @@
+"""
+批量读取收益矩阵，并分块送入后悔值准则计算
+支持 CSV、.npy(内存映射)和逐行 JSON(NDJSON，每行一个方案的收益数组)三种格式
+"""
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from Q1 import calculate_regrets, regret_criterion
+
+DEFAULT_CHUNK_ROWS = 100000
+
+
+def _file_format(path):
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix == '.npy':
+        return 'npy'
+    if suffix in ('.ndjson', '.jsonl', '.json'):
+        return 'ndjson'
+    if suffix in ('.csv', '.txt'):
+        return 'csv'
+    raise ValueError(f"不支持的收益矩阵文件格式: {path}")
+
+
+def iter_payoff_chunks(path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    按行分块读取收益矩阵，每次只有一个块驻留内存
+    参数:
+        path: 收益矩阵文件路径，每行对应一个方案、每列对应一个状态
+        chunk_rows: 每块的行数
+    返回:
+        生成器，逐块产生 (rows, n) 的浮点数组
+    """
+    fmt = _file_format(path)
+    if fmt == 'npy':
+        # 内存映射，切片时才真正读盘
+        matrix = np.load(path, mmap_mode='r')
+        if matrix.ndim != 2:
+            raise ValueError(f"收益矩阵应为二维数组，实际维度为 {matrix.shape}")
+        for start in range(0, matrix.shape[0], chunk_rows):
+            yield np.asarray(matrix[start:start + chunk_rows], dtype=float)
+    elif fmt == 'csv':
+        reader = pd.read_csv(path, header=None, chunksize=chunk_rows, dtype=float)
+        for frame in reader:
+            yield frame.to_numpy()
+    else:
+        with open(path, encoding='utf-8') as f:
+            rows = []
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                rows.append(json.loads(line))
+                if len(rows) == chunk_rows:
+                    yield np.array(rows, dtype=float)
+                    rows = []
+            if rows:
+                yield np.array(rows, dtype=float)
+
+
+def load_payoffs(path):
+    """一次性读入整个收益矩阵，只适合小文件"""
+    return np.concatenate(list(iter_payoff_chunks(path)))
+
+
+def streaming_regret(path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    两遍扫描文件完成后悔值准则决策:
+    第一遍求各状态(列)的最大收益，第二遍分块计算各方案的最大后悔值
+    参数:
+        path: 收益矩阵文件路径
+        chunk_rows: 每块的行数，决定峰值内存
+    返回:
+        best_choice: 最优方案下标
+        max_regrets: (m,) 各方案的最大后悔值
+        stats: 读取统计，包括行数、耗时和每秒处理行数
+    """
+    start = time.perf_counter()
+
+    # 第一遍: 列最大值
+    col_max = None
+    for chunk in iter_payoff_chunks(path, chunk_rows):
+        chunk_max = chunk.max(axis=0)
+        col_max = chunk_max if col_max is None else np.maximum(col_max, chunk_max)
+    if col_max is None:
+        raise ValueError(f"收益矩阵文件为空: {path}")
+
+    # 第二遍: 分块计算后悔值，只保留每个方案的最大后悔值
+    max_regrets = []
+    for chunk in iter_payoff_chunks(path, chunk_rows):
+        _, chunk_max_regrets = regret_criterion(calculate_regrets(chunk, col_max))
+        max_regrets.append(chunk_max_regrets)
+    max_regrets = np.concatenate(max_regrets)
+    best_choice = int(np.argmin(max_regrets))
+
+    seconds = time.perf_counter() - start
+    stats = {
+        'rows': len(max_regrets),
+        'seconds': seconds,
+        'rows_per_sec': len(max_regrets) / seconds if seconds > 0 else float('inf'),
+    }
+    return best_choice, max_regrets, stats
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("用法: python payoff_io.py <收益矩阵文件> [每块行数]")
+        sys.exit(1)
+    chunk_rows = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_CHUNK_ROWS
+    best_choice, max_regrets, stats = streaming_regret(sys.argv[1], chunk_rows)
+    print(f"方案数量: {stats['rows']}")
+    print(f"最优决策: 方案 {best_choice+1}, 最大后悔值为 {max_regrets[best_choice]}")
+    print(f"耗时 {stats['seconds']:.3f}s, 处理速度 {stats['rows_per_sec']:.0f} 行/秒")
@@ -1,6 +1,8 @@
 import numpy as np
 import pandas as pd
 
+from normalization import neutral_normalize
+
 # 原始数据
 data = {
     '人均专著': [0.1, 0.2, 0.6, 0.3, 2.8],
@@ -47,19 +49,8 @@ df['逾期毕业率_向量'] = vector_normalize(df['逾期毕业率'], benefit=F
 
 # 3. 修正后的中性属性规范化方法(对第2列-生师比)
 def neutral_normalize_corrected(series, f0, f1, f2, f_optimal):
-    normalized = []
-    for x in series:
-        if x < f0:
-            normalized.append(0)  
-        elif x < f1:
-            normalized.append(1 - (f1 - x) / (f1 - f0))  # 线性增长到1
-        elif x <= f2:  # 最优区间，直接取1
-            normalized.append(1.0)
-        elif x < f_optimal:
-            normalized.append(1 - (x - f2) / (f_optimal - f2))  # 线性下降到0
-        else:
-            normalized.append(0)  
-    return pd.Series(normalized)
+    # 低于f0取0，[f0, f1)线性增长到1，最优区间[f1, f2]取1，(f2, f_optimal)线性下降到0，其余取0
+    return pd.Series(neutral_normalize(series.to_numpy(), f0, f1, f2, f_optimal), index=series.index)
 
 df['生师比_中性'] = neutral_normalize_corrected(df['生师比'], f0, f1, f2, f_optimal)
 
@@ -1,5 +1,7 @@
 import numpy as np
-from numpy.linalg import eig
+
+from ahp import geometric_mean_weights, power_method
+from ri_table import get_ri
 
 # 给定的判断矩阵
 A = np.array([
@@ -21,23 +23,13 @@ def sum_method(matrix):
 
 # 2. 方根法
 def root_method(matrix):
-    # 计算几何平均
-    row_products = np.prod(matrix, axis=1)
-    roots = np.power(row_products, 1/matrix.shape[0])
-    # 归一化
-    weights = roots / roots.sum()
-    return weights
+    # 在对数空间计算几何平均并归一化，阶数较大时连乘不会溢出
+    return geometric_mean_weights(matrix)
 
 # 3. 特征值法
-def eigenvalue_method(matrix):
-    # 求特征值与特征向量
-    eigenvalues, eigenvectors = eig(matrix)
-    
-    max_index = np.argmax(eigenvalues)
-    max_eigenvector = eigenvectors[:, max_index].real
-    
-    # 计算权重
-    weights = max_eigenvector / max_eigenvector.sum()
+def eigenvalue_method(matrix, w0=None):
+    # 幂迭代求主特征向量，只需一对特征值/特征向量，不做完整特征分解
+    weights, _, _ = power_method(matrix, w0=w0)
     return weights
 
 # 一致性检验
@@ -48,8 +40,8 @@ def consistency_check(matrix, weights):
     lambda_max = (weighted_sum / weights).mean()
     # 计算CI
     CI = (lambda_max - n) / (n - 1)
-    # RI值(对于n=6)
-    RI = 1.24  
+    # RI值，按阶数从共享RI表中查询
+    RI = get_ri(n)
     # 计算CR
     CR = CI / RI
     return lambda_max, CI, CR
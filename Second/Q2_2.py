@@ -1,18 +1,20 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 from numpy.linalg import eig
 from tqdm import tqdm
 
-def generate_random_matrix(n):
+from ahp import geometric_mean_weights, random_reciprocal_matrices
+
+def generate_random_matrix(n, rng=None):
     """生成随机判断矩阵"""
-    matrix = np.ones((n, n))
-    for i in range(n):
-        for j in range(i+1, n):
-            # 随机生成1-9或其倒数
-            value = np.random.choice([1/9, 1/8, 1/7, 1/6, 1/5, 1/4, 1/3, 1/2, 
-                                     1, 2, 3, 4, 5, 6, 7, 8, 9])
-            matrix[i, j] = value
-            matrix[j, i] = 1 / value
-    return matrix
+    return generate_random_matrices(1, n, rng)[0]
+
+def generate_random_matrices(k, n, rng=None):
+    """批量生成 k 个随机判断矩阵，上三角元素随机取1-9或其倒数，下三角取倒数"""
+    return random_reciprocal_matrices(k, n, np.random.default_rng(rng))
 
 def calculate_ci(matrix):
     """计算一致性指标CI"""
@@ -22,49 +24,118 @@ def calculate_ci(matrix):
     CI = (lambda_max - n) / (n - 1)
     return CI
 
-def simulate_ri(n, num_samples=1000, method='eigen'):
-    """模拟计算随机一致性指标RI"""
-    CI_values = []
-    for _ in tqdm(range(num_samples), desc=f"n={n}"):
-        matrix = generate_random_matrix(n)
-        if method == 'eigen':
-            CI = calculate_ci(matrix)
-        elif method == 'root':
-            # 方根法计算CI
-            roots = np.power(np.prod(matrix, axis=1), 1/n)
-            weights = roots / roots.sum()
-            weighted_sum = matrix @ weights
-            lambda_max = (weighted_sum / weights).mean()
-            CI = (lambda_max - n) / (n - 1)
-        CI_values.append(CI)
-    return np.mean(CI_values)
+def batch_ci(matrices, method='eigen'):
+    """批量计算一组 (k, n, n) 判断矩阵的一致性指标CI"""
+    n = matrices.shape[-1]
+    if method == 'eigen':
+        lambda_max = np.linalg.eigvals(matrices).real.max(axis=-1)
+    elif method == 'root':
+        # 方根法计算CI
+        weights = geometric_mean_weights(matrices)
+        lambda_max = (np.einsum('kij,kj->ki', matrices, weights) / weights).mean(axis=-1)
+    else:
+        raise ValueError(f"未知的CI计算方法: {method}")
+    return (lambda_max - n) / (n - 1)
+
+def simulate_ri(n, num_samples=1000, method='eigen', batch_size=10000, rng=None, progress=True):
+    """
+    模拟计算随机一致性指标RI
+    每次生成 batch_size 个随机矩阵并批量计算CI，内存占用只与 batch_size 有关
+    progress 为 False 时不显示进度条
+    """
+    rng = np.random.default_rng(rng)
+    total = 0.0
+    batches = range(0, num_samples, batch_size)
+    for start in tqdm(batches, desc=f"n={n}", disable=not progress or len(batches) == 1):
+        k = min(batch_size, num_samples - start)
+        total += batch_ci(generate_random_matrices(k, n, rng), method).sum()
+    return total / num_samples
+
+def _batch_ci_sums(task):
+    """进程池任务: 用给定种子生成一批随机矩阵，返回CI的和与平方和"""
+    n, method, batch_size, seed_seq = task
+    ci = batch_ci(generate_random_matrices(batch_size, n, np.random.default_rng(seed_seq)), method)
+    return ci.sum(), np.square(ci).sum()
 
-# 验证不同阶数的RI值
-max_n = 9  # 最大矩阵阶数
-num_samples = 1000  # 每个阶数的样本数
+def parallel_simulate_ri(orders, method='eigen', tol=1e-3, seed=0, batch_size=1000,
+                         round_batches=16, max_samples=10**7, workers=None):
+    """
+    多进程、可复现、自适应停止的RI模拟
+    每个阶数的样本按批划分，第 i 批的随机数种子由 SeedSequence 依次 spawn 得到，
+    与由哪个进程计算无关；各批结果按批次顺序累加，每累加一批检查一次停止条件，
+    因此停止位置和结果都与进程数、round_batches 无关，逐位一致
+    每轮提交 round_batches 批并行计算，平均CI的标准误小于 tol 或样本数达到 max_samples 时停止，
+    本轮剩余未取用的批不再计入
+    参数:
+        orders: 需要计算的矩阵阶数
+        method: 'eigen' 或 'root'
+        tol: 平均CI标准误的停止阈值
+        seed: 随机数种子
+        batch_size: 每批的样本数，也是停止判断的粒度
+        round_batches: 每轮提交给进程池的批数
+        workers: 进程数，默认取CPU核数，1 表示在当前进程内计算
+    返回:
+        dict: 阶数 -> {'RI', 'samples', 'std_error', 'seconds'}
+    """
+    workers = workers or os.cpu_count()
+    order_seeds = np.random.SeedSequence(seed).spawn(len(orders))
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    mapper = pool.map if pool is not None else map
+    results = {}
+    try:
+        for n, order_seed in zip(orders, order_seeds):
+            start = time.perf_counter()
+            total = total_sq = 0.0
+            samples = 0
+            std_error = np.inf
+            while std_error >= tol and samples < max_samples:
+                tasks = [(n, method, batch_size, child) for child in order_seed.spawn(round_batches)]
+                for batch_sum, batch_sq in mapper(_batch_ci_sums, tasks):
+                    total += batch_sum
+                    total_sq += batch_sq
+                    samples += batch_size
+                    mean = total / samples
+                    variance = max(total_sq / samples - mean ** 2, 0.0) * samples / (samples - 1)
+                    std_error = np.sqrt(variance / samples)
+                    if std_error < tol or samples >= max_samples:
+                        break
+            results[n] = {
+                'RI': float(mean),
+                'samples': samples,
+                'std_error': float(std_error),
+                'seconds': time.perf_counter() - start,
+            }
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    return results
 
-print("特征值法计算的RI值:")
-ri_eigen = [0]  # n=1时RI=0
-for n in range(2, max_n+1):
-    ri = simulate_ri(n, num_samples, method='eigen')
-    ri_eigen.append(ri)
-print("n=1-9的RI值(特征值法):", [f"{x:.4f}" for x in ri_eigen])
+if __name__ == "__main__":
+    # 验证不同阶数的RI值
+    max_n = 9  # 最大矩阵阶数
+    tol = 1e-3  # 平均CI标准误的停止阈值
 
-print("\n方根法计算的RI值:")
-ri_root = [0]  # n=1时RI=0
-for n in range(2, max_n+1):
-    ri = simulate_ri(n, num_samples, method='root')
-    ri_root.append(ri)
-print("n=1-9的RI值(方根法):", [f"{x:.4f}" for x in ri_root])
+    ri_values = {}
+    for method, name in (('eigen', '特征值法'), ('root', '方根法')):
+        print(f"{name}计算的RI值:")
+        report = parallel_simulate_ri(range(2, max_n+1), method=method, tol=tol)
+        for n, item in report.items():
+            print(f"n={n}: RI={item['RI']:.4f}, 样本数={item['samples']}, "
+                  f"标准误={item['std_error']:.5f}, 耗时={item['seconds']:.2f}s")
+        ri_values[method] = [0] + [report[n]['RI'] for n in range(2, max_n+1)]  # n=1时RI=0
+        print(f"n=1-9的RI值({name}):", [f"{x:.4f}" for x in ri_values[method]])
+        print()
+    ri_eigen = ri_values['eigen']
+    ri_root = ri_values['root']
 
-# 与参考值对比
-ref_eigen = [0, 0.5182, 0.8942, 1.1104, 1.2480, 1.3324, 1.4028, 1.4520, 1.4844]
-ref_root = [0, 0.5230, 0.8601, 1.0835, 1.2228, 1.3189, 1.3929, 1.4381, 1.4717]
+    # 与参考值对比
+    ref_eigen = [0, 0.5182, 0.8942, 1.1104, 1.2480, 1.3324, 1.4028, 1.4520, 1.4844]
+    ref_root = [0, 0.5230, 0.8601, 1.0835, 1.2228, 1.3189, 1.3929, 1.4381, 1.4717]
 
-print("\n与参考值对比(特征值法):")
-for n in range(1, max_n+1):
-    print(f"n={n}: 模拟值={ri_eigen[n-1]:.4f}, 参考值={ref_eigen[n-1]:.4f}")
+    print("\n与参考值对比(特征值法):")
+    for n in range(1, max_n+1):
+        print(f"n={n}: 模拟值={ri_eigen[n-1]:.4f}, 参考值={ref_eigen[n-1]:.4f}")
 
-print("\n与参考值对比(方根法):")
-for n in range(1, max_n+1):
-    print(f"n={n}: 模拟值={ri_root[n-1]:.4f}, 参考值={ref_root[n-1]:.4f}")
+    print("\n与参考值对比(方根法):")
+    for n in range(1, max_n+1):
+        print(f"n={n}: 模拟值={ri_root[n-1]:.4f}, 参考值={ref_root[n-1]:.4f}")
@@ -1,37 +1,180 @@
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
-from scipy.optimize import minimize
+from scipy.optimize import linprog, minimize
+
+from ri_table import get_bwm_ci
+
+def _best_worst_index(BO, OW):
+    # 最佳准则为 BO 中值为 1 的位置，最差准则为 OW 中值为 1 的位置
+    return int(np.flatnonzero(BO == 1)[0]), int(np.flatnonzero(OW == 1)[0])
 
-def calculate_bwm_weights(BO, OW, criteria_names):
+
+def bwm_structure(n):
     """
-    计算BWM权重
-    :param BO: Best-to-Others向量
-    :param OW: Others-to-Worst向量
-    :param criteria_names: 准则名称列表
-    :return: 权重向量和一致性比率
+    n 个准则的线性BWM中与比较值无关的部分，可在所有专家之间共用
+    变量为 [w_1, ..., w_n, ξ]，目标为最小化 ξ，约束 Σw = 1、w >= 0、ξ >= 0
     """
-    n = len(criteria_names)
-    
+    c = np.zeros(n + 1)
+    c[-1] = 1
+    A_eq = np.ones((1, n + 1))
+    A_eq[0, -1] = 0
+    return {'n': n, 'c': c, 'A_eq': A_eq, 'b_eq': np.ones(1),
+            'b_ub': np.zeros(4 * n), 'bounds': [(0, None)] * (n + 1)}
+
+
+def _check_bwm_vectors(BO, OW):
+    """检查 (k, n) 的 BO、OW: 每组都要有最佳、最差准则，每个准则至少在其中一个向量中有比较值"""
+    if not ((BO == 1).any(axis=1).all() and (OW == 1).any(axis=1).all()):
+        raise ValueError("每组 BO、OW 中都应有值为 1 的最佳、最差准则")
+    uncompared = (BO == 0) & (OW == 0)
+    if uncompared.any():
+        expert, criterion = np.argwhere(uncompared)[0]
+        raise ValueError(f"第 {expert} 组中第 {criterion} 个准则在 BO、OW 中都没有比较值，"
+                         f"线性BWM无法确定其权重")
+
+
+def _inequality_matrices(BO, OW):
+    """
+    批量构造 k 组 BO、OW 的不等式约束矩阵 (k, 4n, n+1)
+    前 n 行为 w_B - a_Bj w_j - ξ <= 0，接着 n 行为 w_j - a_jW w_W - ξ <= 0，后 2n 行为差值取反；
+    j 为最佳(最差)准则自身或比较值为 0 时该行只剩 -ξ <= 0，行数对所有专家都相同；
+    在 BO、OW 中比较值都为 0 的准则只受 Σw = 1 约束，会吸收全部权重，因此直接报错
+    """
+    _check_bwm_vectors(BO, OW)
+    k, n = BO.shape
+    best = np.argmax(BO == 1, axis=1)[:, None]
+    worst = np.argmax(OW == 1, axis=1)[:, None]
+    experts = np.arange(k)[:, None]
+    j = np.arange(n)[None, :]
+
+    diff = np.zeros((k, 2 * n, n + 1))
+    diff[experts, j, best] = 1
+    diff[experts, j, j] -= BO
+    diff[experts, n + j, j] = 1
+    diff[experts, n + j, worst] -= OW
+    diff[:, :n][BO == 0] = 0
+    diff[:, n:][OW == 0] = 0
+    A_ub = np.concatenate([diff, -diff], axis=1)
+    A_ub[..., -1] = -1
+    return A_ub
+
+
+def _solve_linear_batch(BO, OW, structure=None, slice_size=16):
+    """
+    逐个专家求解线性BWM，约束结构只构造一次；
+    不等式约束矩阵每次只为 slice_size 个专家构造，内存与专家总数无关
+    """
+    k, n = BO.shape
+    if structure is None:
+        structure = bwm_structure(n)
+    # 先检查全部输入，出错时在求解之前报告全局的专家编号
+    _check_bwm_vectors(BO, OW)
+    weights = np.empty((k, n))
+    xi = np.empty(k)
+    for start in range(0, k, slice_size):
+        A_ub = _inequality_matrices(BO[start:start + slice_size], OW[start:start + slice_size])
+        for offset, A in enumerate(A_ub):
+            i = start + offset
+            result = linprog(structure['c'], A_ub=A, b_ub=structure['b_ub'],
+                             A_eq=structure['A_eq'], b_eq=structure['b_eq'],
+                             bounds=structure['bounds'], method='highs')
+            if not result.success:
+                raise RuntimeError(f"第 {i} 组线性BWM求解失败: {result.message}")
+            weights[i], xi[i] = result.x[:-1], result.x[-1]
+    return weights, xi
+
+
+def _solve_linear_chunk(task):
+    """进程池任务: 用主进程构造好的约束结构求解一块专家的线性BWM"""
+    BO, OW, structure = task
+    return _solve_linear_batch(BO, OW, structure)
+
+
+def solve_bwm_linear(BO, OW):
+    """
+    线性BWM: 把 |w_B - a_Bj w_j| <= ξ 和 |w_j - a_jW w_W| <= ξ 写成线性约束，
+    在 Σw = 1、w >= 0 下最小化 ξ，一次 HiGHS 求解得到精确的权重和 ξ*
+    参数:
+        BO: Best-to-Others向量
+        OW: Others-to-Worst向量
+    返回:
+        weights: 权重向量
+        xi_star: 最优的最大偏差 ξ*
+    """
+    weights, xi = _solve_linear_batch(np.asarray(BO, dtype=float)[None],
+                                      np.asarray(OW, dtype=float)[None])
+    return weights[0], xi[0]
+
+
+def batch_bwm(BO, OW, workers=None, chunk_size=100, CI=None):
+    """
+    批量求解多位专家的线性BWM，计算过程不输出任何内容
+    参数:
+        BO: (k, n) 各专家的 Best-to-Others 向量
+        OW: (k, n) 各专家的 Others-to-Worst 向量
+        workers: 并行进程数，None 或 1 时在当前进程内计算
+        chunk_size: 并行时每个进程一次处理的专家数
+        CI: 一致性指标，默认按准则数从共享一致性指标表中查询
+    返回:
+        weights: (k, n) 各专家的权重
+        xi: (k,) 各专家线性模型的 ξ*
+        CR: (k,) 各专家的一致性比率，按权重在比值模型下的最大偏差计算，与 bwm_weights 的线性模式一致
+        group_weights: (n,) 各专家权重的算术平均(归一化后)
+    """
+    BO = np.atleast_2d(np.asarray(BO, dtype=float))
+    OW = np.atleast_2d(np.asarray(OW, dtype=float))
+    if BO.shape != OW.shape:
+        raise ValueError(f"BO 与 OW 形状不一致: {BO.shape} != {OW.shape}")
+    k, n = BO.shape
+    # 先查一致性指标，表中没有时在求解之前报错
+    if CI is None:
+        CI = get_bwm_ci(n)
+    structure = bwm_structure(n)
+    if workers is not None and workers > 1 and k > chunk_size:
+        chunks = [(BO[i:i + chunk_size], OW[i:i + chunk_size], structure)
+                  for i in range(0, k, chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_solve_linear_chunk, chunks))
+        weights = np.concatenate([w for w, _ in results])
+        xi = np.concatenate([x for _, x in results])
+    else:
+        weights, xi = _solve_linear_batch(BO, OW, structure)
+
+    CR = ratio_deviation(weights, BO, OW) / CI if CI > 0 else np.zeros(k)
+    group_weights = weights.mean(axis=0)
+    group_weights /= group_weights.sum()
+    return weights, xi, CR, group_weights
+
+
+def solve_bwm_nonlinear(BO, OW):
+    """
+    原始的非线性BWM: 用 SLSQP 最小化权重比值与比较值的最大偏差
+    返回:
+        weights: 权重向量
+        xi_star: 最优的最大偏差 ξ*
+    """
+    BO = np.asarray(BO, dtype=float)
+    OW = np.asarray(OW, dtype=float)
+    n = len(BO)
+    # 最佳、最差准则和参与比较的准则只需确定一次，不在目标函数中反复查找
+    best_idx, worst_idx = _best_worst_index(BO, OW)
+    best_others = np.flatnonzero((np.arange(n) != best_idx) & (BO != 0))
+    others_worst = np.flatnonzero((np.arange(n) != worst_idx) & (OW != 0))
+
     # 构建优化问题
     def objective(x):
         weights = x[:-1]    # 前 n 个元素为权重
         xi = x[-1]          # 最有一个元素为 ξ (最大偏差)
         
-        # 计算约束违反程度
-        max_violation = 0
-        
-        # 最佳准则对其他准则的约束
-        best_idx = BO.index(1)  # 最佳准则的索引(BO中值为1的位置)
-        for j in range(n):
-            if j != best_idx and BO[j] != 0:  # 跳过最佳准则自身
-                violation = abs(weights[best_idx]/weights[j] - BO[j])
-                max_violation = max(max_violation, violation)
-        
-        # 其他准则对最差准则的约束
-        worst_idx = OW.index(1)  # 最差准则的索引(OW中值为1的位置)
-        for j in range(n):
-            if j != worst_idx and OW[j] != 0:  # 跳过最差准则自身
-                violation = abs(weights[j]/weights[worst_idx] - OW[j])
-                max_violation = max(max_violation, violation)
+        # 最佳准则对其他准则、其他准则对最差准则的约束违反程度
+        violations = np.concatenate([
+            np.abs(weights[best_idx] / weights[best_others] - BO[best_others]),
+            np.abs(weights[others_worst] / weights[worst_idx] - OW[others_worst]),
+        ])
+        max_violation = violations.max() if len(violations) else 0
         
         # 目标是使ξ等于最大违反程度，但不小于它
         return max(xi, max_violation)
@@ -60,22 +203,38 @@ def calculate_bwm_weights(BO, OW, criteria_names):
         constraints=constraints,
         options={'ftol': 1e-8, 'disp': False}
     )
+    return result.x[:-1], result.x[-1]
+
+
+def bwm_weights(BO, OW, method='linear', CI=None):
+    """
+    计算BWM权重和一致性比率，不输出任何内容
+    :param BO: Best-to-Others向量
+    :param OW: Others-to-Worst向量
+    :param method: 'linear'(线性规划，默认) 或 'nonlinear'(原始的 SLSQP 求解)
+    :param CI: 一致性指标，默认按准则数从共享一致性指标表中查询
+    :return: 权重向量、ξ* 和一致性比率
+    """
+    solvers = {'linear': solve_bwm_linear, 'nonlinear': solve_bwm_nonlinear}
+    if method not in solvers:
+        raise ValueError(f"未知的BWM求解方法: {method}")
+    weights, xi_star = solvers[method](BO, OW)
     
-    # 提取结果
-    weights = result.x[:-1]
-    xi_star = result.x[-1]
+    # 一致性指标表针对比值模型的 ξ；线性模型的 ξ 是权重之差，量纲不同，
+    # 因此线性模式按所得权重在比值模型下的最大偏差计算一致性比率
+    xi_ratio = xi_star if method == 'nonlinear' else ratio_deviation(weights, BO, OW)
     
-    # 计算一致性指标CI (根据准则数量)
-    consistency_index = {
-        2: 0.00, 3: 0.52, 4: 0.89, 5: 1.11,
-        6: 1.25, 7: 1.35, 8: 1.40, 9: 1.45, 10: 1.49
-    }
-    CI = consistency_index.get(n, 1.5)  # 默认为1.5如果超出范围
+    # 计算一致性指标CI (根据准则数量，从共享一致性指标表中查询)
+    if CI is None:
+        CI = get_bwm_ci(len(weights))
     
     # 计算一致性比率
-    CR = xi_star / CI if CI > 0 else 0
-    
-    # 输出结果
+    CR = xi_ratio / CI if CI > 0 else 0
+    return weights, xi_star, CR
+
+
+def print_bwm_report(weights, CR, criteria_names):
+    """输出BWM求解结果"""
     print("\n最佳最差法(BWM)求解结果:")
     print("=" * 50)
     for i, name in enumerate(criteria_names):
@@ -87,9 +246,99 @@ def calculate_bwm_weights(BO, OW, criteria_names):
     else:
         print("警告: 一致性不佳 (CR >= 0.1)，建议重新评估比较数据")
     print("=" * 50)
-    
+
+
+def calculate_bwm_weights(BO, OW, criteria_names, method='linear'):
+    """
+    计算BWM权重并输出结果
+    :param BO: Best-to-Others向量
+    :param OW: Others-to-Worst向量
+    :param criteria_names: 准则名称列表
+    :param method: 'linear'(线性规划，默认) 或 'nonlinear'(原始的 SLSQP 求解)
+    :return: 权重向量和一致性比率
+    """
+    weights, _, CR = bwm_weights(BO, OW, method)
+    print_bwm_report(weights, CR, criteria_names)
     return weights, CR
 
+
+def random_bwm_vectors(n, seed=0):
+    """由随机的真实权重按 1-9 标度取整生成一组 BO、OW 向量"""
+    rng = np.random.default_rng(seed)
+    true_weights = rng.uniform(1, 9, size=n)
+    best, worst = np.argmax(true_weights), np.argmin(true_weights)
+    BO = np.clip(np.rint(true_weights[best] / true_weights), 1, 9)
+    OW = np.clip(np.rint(true_weights / true_weights[worst]), 1, 9)
+    # 保证第一个值为 1 的位置就是最佳/最差准则
+    BO[BO == 1] = 2
+    OW[OW == 1] = 2
+    BO[best], OW[worst] = 1, 1
+    return BO, OW
+
+
+def ratio_deviation(weights, BO, OW):
+    """
+    权重在非线性(比值)BWM意义下的最大偏差 max(|w_B/w_j - a_Bj|, |w_j/w_W - a_jW|)，
+    与一致性指标表的量纲一致；weights、BO、OW 可以是 (n,) 或 (k, n)
+    比较值为 0 的准则不参与计算，权重为 0 的准则使偏差为无穷大
+    """
+    weights = np.asarray(weights, dtype=float)
+    BO = np.broadcast_to(np.asarray(BO, dtype=float), weights.shape)
+    OW = np.broadcast_to(np.asarray(OW, dtype=float), weights.shape)
+    best = np.argmax(BO == 1, axis=-1)[..., None]
+    worst = np.argmax(OW == 1, axis=-1)[..., None]
+    w_best = np.take_along_axis(weights, best, axis=-1)
+    w_worst = np.take_along_axis(weights, worst, axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        best_dev = np.where(BO != 0, np.abs(w_best / weights - BO), 0)
+        worst_dev = np.where(OW != 0, np.abs(weights / w_worst - OW), 0)
+    return np.maximum(best_dev.max(axis=-1), worst_dev.max(axis=-1))
+
+
+def max_deviation(weights, BO, OW):
+    """权重在线性BWM意义下的最大偏差 max(|w_B - a_Bj w_j|, |w_j - a_jW w_W|)"""
+    BO = np.asarray(BO, dtype=float)
+    OW = np.asarray(OW, dtype=float)
+    best_idx, worst_idx = _best_worst_index(BO, OW)
+    return max(np.abs(weights[best_idx] - BO * weights).max(),
+               np.abs(weights - OW * weights[worst_idx]).max())
+
+
+def benchmark(sizes=(5, 10, 20, 50, 100, 200), nonlinear_max=50):
+    """
+    线性规划与 SLSQP 的求解时间和所得权重的最大偏差对比，SLSQP 只测到 nonlinear_max 个准则
+    SLSQP 的 ξ 变量不一定等于真实偏差，因此两者都按 max_deviation 重新计算
+    """
+    print("准则数   线性(s)    线性偏差    SLSQP(s)   SLSQP偏差")
+    for n in sizes:
+        BO, OW = random_bwm_vectors(n, seed=n)
+        start = time.perf_counter()
+        weights, _ = solve_bwm_linear(BO, OW)
+        linear_time = time.perf_counter() - start
+        line = f"{n:<8} {linear_time:<10.4f} {max_deviation(weights, BO, OW):<11.4f}"
+        if n <= nonlinear_max:
+            start = time.perf_counter()
+            weights, _ = solve_bwm_nonlinear(BO, OW)
+            line += f" {time.perf_counter() - start:<10.4f} {max_deviation(weights, BO, OW):.4f}"
+        print(line)
+
+
+def benchmark_batch(k=500, n=10, workers=None):
+    """逐个调用与批量求解 k 位专家的对比"""
+    vectors = [random_bwm_vectors(n, seed=i) for i in range(k)]
+    BO = np.array([bo for bo, _ in vectors])
+    OW = np.array([ow for _, ow in vectors])
+    start = time.perf_counter()
+    single = np.array([solve_bwm_linear(bo, ow)[0] for bo, ow in vectors])
+    single_time = time.perf_counter() - start
+    start = time.perf_counter()
+    weights, _, CR, group_weights = batch_bwm(BO, OW, workers=workers)
+    batch_time = time.perf_counter() - start
+    print(f"{k} 位专家、{n} 个准则: 逐个求解 {single_time:.3f}s, 批量求解 {batch_time:.3f}s, "
+          f"最大差异 {np.abs(weights - single).max():.2e}")
+    print(f"CR < 0.1 的专家 {np.mean(CR < 0.1):.1%}, 群组权重: {np.round(group_weights, 4)}")
+
+
 # 示例使用
 if __name__ == "__main__":
     # 定义准则名称
@@ -106,3 +355,8 @@ if __name__ == "__main__":
     BO2 = [2, 1, 4, 3, 8]  # Best-to-Others (Best criterion: Price)
     OW2 = [4, 8, 2, 3, 1]  # Others-to-Worst (Worst criterion: Style)
     weights2, cr2 = calculate_bwm_weights(BO2, OW2, criteria)
+
+    if '--bench' in sys.argv:
+        print()
+        benchmark()
+        benchmark_batch()
@@ -1,6 +1,8 @@
 import numpy as np
 import pandas as pd
 
+from weighting import deviation_maximization, entropy_weight
+
 # 原始数据
 data = {
     '企业': ['a1', 'a2', 'a3', 'a4'],
@@ -29,41 +31,11 @@ def normalize_matrix(matrix):
 matrix = df.values
 norm_matrix = normalize_matrix(matrix)
 
-# 熵权法计算权重
-def entropy_weight(matrix):
-    # 计算每个指标的比重
-    p = matrix / np.sum(matrix, axis=0)
-    
-    # 计算每个指标的熵值
-    epsilon = 1e-12  # 避免log(0)
-    e = -np.sum(p * np.log(p + epsilon), axis=0) / np.log(len(matrix))
-    
-    # 计算差异系数
-    g = 1 - e
-    
-    # 计算权重
-    weights = g / np.sum(g)
-    return weights
-
 entropy_weights = entropy_weight(norm_matrix)
 print("熵权法计算的权重:")
 for col, weight in zip(df.columns, entropy_weights):
     print(f"{col}: {weight:.4f}")
     
-def deviation_maximization(matrix):
-    # 计算每个指标下各方案与其他方案的距离
-    n, m = matrix.shape
-    total_deviation = np.zeros(m)
-    
-    for j in range(m):
-        for i in range(n):
-            for k in range(n):
-                total_deviation[j] += abs(matrix[i, j] - matrix[k, j])
-    
-    # 计算权重
-    weights = total_deviation / np.sum(total_deviation)
-    return weights
-
 deviation_weights = deviation_maximization(norm_matrix)
 print("\n离差最大化方法计算的权重:")
 for col, weight in zip(df.columns, deviation_weights):
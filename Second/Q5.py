@@ -1,5 +1,8 @@
 import numpy as np
 
+from ahp import geometric_mean_weights, prioritize
+from ri_table import get_ri
+
 def calculate_weights(matrix):
     """
     使用几何平均法计算权重向量
@@ -8,9 +11,8 @@ def calculate_weights(matrix):
     返回:
         weights: 归一化的权重向量
     """
-    n = matrix.shape[0]
-    geometric_means = np.prod(matrix, axis=1) ** (1/n)
-    return geometric_means / np.sum(geometric_means)
+    # 在对数空间计算几何平均，避免阶数较大时连乘溢出
+    return geometric_mean_weights(matrix)
 
 def check_consistency(matrix, weights):
     """
@@ -29,9 +31,8 @@ def check_consistency(matrix, weights):
     # 计算一致性指标CI
     CI = (lambda_max - n) / (n - 1)
     
-    # 随机一致性指标RI
-    RI_table = {1: 0, 2: 0, 3: 0.58, 4: 0.9, 5: 1.12, 6: 1.24, 7: 1.32, 8: 1.41, 9: 1.45}
-    RI = RI_table.get(n, 1.5)  # 默认值为1.5
+    # 随机一致性指标RI，表中没有的阶数按需模拟
+    RI = get_ri(n)
     
     # 一致性比率CR
     CR = CI / RI if RI != 0 else 0
@@ -113,14 +114,11 @@ def ahp_analysis():
         ])
     ]
     
-    # 计算每个属性下候选人的权重并检验一致性
-    candidate_weights = np.zeros((len(attributes), 3))
+    # 一次批量计算所有属性下候选人的权重并检验一致性
+    candidate_weights, _, _, candidate_CR = prioritize(np.stack(candidate_matrices), method='root')
     for i in range(len(attributes)):
-        mat = candidate_matrices[i]
-        candidate_weights[i] = calculate_weights(mat)
-        
-        CR, is_consistent = check_consistency(mat, candidate_weights[i])
-        if not is_consistent:
+        CR = candidate_CR[i]
+        if not CR < 0.1:
             print(f"警告：{attributes[i]}判断矩阵一致性比率CR={CR:.4f} > 0.1，判断不一致!")
         else:
             print(f"{attributes[i]}判断矩阵一致性比率CR={CR:.4f} < 0.1，判断一致。")
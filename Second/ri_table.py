@@ -0,0 +1,117 @@
+"""
+随机一致性指标RI和BWM一致性指标的共享查询表
+AHP(Q2_1、Q5、ahp)统一从这里取RI，BWM(Q3)从这里取按准则数给出的一致性指标；
+1-10 阶直接使用 Saaty 给出的标准值，其余阶数按需调用 Q2_2 的模拟计算(不显示进度)，
+结果写入带版本号的磁盘缓存，以 (阶数, 方法, 样本数, 种子) 为键，之后的进程直接读取，不再重复模拟
+"""
+import json
+import os
+import tempfile
+
+CACHE_VERSION = 1
+DEFAULT_SAMPLES = 100000
+DEFAULT_SEED = 0
+# 超过该阶数时模拟耗时过长(30 阶约需 1.5 分钟)，需显式调高 max_order 或直接给出 RI
+MAX_SIMULATED_ORDER = 30
+
+# 特征值法的标准RI值
+STANDARD_RI = {1: 0.0, 2: 0.0, 3: 0.58, 4: 0.90, 5: 1.12, 6: 1.24, 7: 1.32, 8: 1.41, 9: 1.45, 10: 1.49}
+
+# BWM 非线性(比值)模型 ξ* 的一致性指标，按准则数给出
+BWM_CONSISTENCY_INDEX = {1: 0.0, 2: 0.0, 3: 0.52, 4: 0.89, 5: 1.11, 6: 1.25, 7: 1.35, 8: 1.40,
+                         9: 1.45, 10: 1.49}
+
+# 进程内的缓存表，首次查询时从磁盘载入
+_table = None
+
+
+def cache_path():
+    """缓存文件位置，可用环境变量 DECISION_ANALYSIS_CACHE 指定目录"""
+    directory = os.environ.get('DECISION_ANALYSIS_CACHE',
+                               os.path.join(os.path.expanduser('~'), '.cache', 'decision-analysis'))
+    return os.path.join(directory, 'ri_table.json')
+
+
+def _cache_key(n, method, num_samples, seed):
+    return f"{n}:{method}:{num_samples}:{seed}"
+
+
+def _read_disk():
+    try:
+        with open(cache_path(), encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    # 版本不一致的缓存直接丢弃，重新模拟
+    if data.get('version') != CACHE_VERSION:
+        return {}
+    return data.get('entries', {})
+
+
+def _write_disk(entries):
+    path = cache_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # 先与磁盘上其他进程写入的内容合并，再原子替换
+    merged = _read_disk()
+    merged.update(entries)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump({'version': CACHE_VERSION, 'entries': merged}, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def get_ri(n, method='eigen', num_samples=DEFAULT_SAMPLES, seed=DEFAULT_SEED,
+           max_order=MAX_SIMULATED_ORDER):
+    """
+    查询 n 阶判断矩阵的随机一致性指标RI
+    参数:
+        n: 矩阵阶数
+        method: 'eigen'(特征值法) 或 'root'(方根法)
+        num_samples: 模拟样本数
+        seed: 模拟的随机数种子
+        max_order: 允许现场模拟的最大阶数
+    返回:
+        RI 值；n <= 2 时为 0，特征值法 10 阶以内为标准值
+    """
+    global _table
+    if n <= 2:
+        return 0.0
+    if method == 'eigen' and n in STANDARD_RI:
+        return STANDARD_RI[n]
+    if _table is None:
+        _table = _read_disk()
+    key = _cache_key(n, method, num_samples, seed)
+    if key not in _table:
+        if n > max_order:
+            raise ValueError(f"{n} 阶的RI不在表中，模拟超过 {max_order} 阶的RI耗时过长，"
+                             f"请显式给出 RI 或调高 max_order")
+        # 延迟导入: Q2_2 依赖 ahp，而 ahp 又依赖本模块
+        from Q2_2 import simulate_ri
+        _table[key] = float(simulate_ri(n, num_samples, method, rng=seed, progress=False))
+        _write_disk({key: _table[key]})
+    return _table[key]
+
+
+def get_bwm_ci(n):
+    """
+    查询 n 个准则的BWM一致性指标，适用于非线性(比值)模型的 ξ*
+    表外的准则数没有可用的值，需由调用方显式给出
+    """
+    if n not in BWM_CONSISTENCY_INDEX:
+        raise ValueError(f"BWM一致性指标表中没有 {n} 个准则的值，请显式给出 CI")
+    return BWM_CONSISTENCY_INDEX[n]
+
+
+def clear_cache():
+    """清空进程内和磁盘上的缓存"""
+    global _table
+    _table = {}
+    try:
+        os.remove(cache_path())
+    except FileNotFoundError:
+        pass
+
+
+if __name__ == "__main__":
+    for method in ('eigen', 'root'):
+        print(f"{method}: " + ", ".join(f"n={n}: {get_ri(n, method):.4f}" for n in range(1, 16)))
@@ -1,6 +1,12 @@
+import os
+import sys
+
 import numpy as np
 import pandas as pd
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Second'))
+from weighting import deviation_maximization
+
 # 原始数据
 data = {
     '企业': ['a1', 'a2', 'a3', 'a4'],
@@ -40,21 +46,8 @@ print(pd.DataFrame(norm_matrix, index=df.index, columns=df.columns))
 
 # 2. 离差最大化法确定权重
 def deviation_maximization_weight(matrix):
-    n, m = matrix.shape
-    weights = np.zeros(m)
-    
-    for j in range(m):
-        # 计算第j个属性的总离差
-        total_deviation = 0
-        for k in range(n):
-            for l in range(n):
-                total_deviation += abs(matrix[k, j] - matrix[l, j])
-        
-        weights[j] = total_deviation
-    
-    # 归一化权重
-    weights = weights / weights.sum()
-    return weights
+    # 与第二章共用按列排序求总离差的实现
+    return deviation_maximization(matrix)
 
 weights = deviation_maximization_weight(norm_matrix)
 print("\n属性权重:")